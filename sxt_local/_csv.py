@@ -0,0 +1,185 @@
+"""CSV tables serialization, using pyarrow and polars when they are installed
+
+The files keep the layout of pandas to_csv: the index is the first column,
+with an empty header when it is unnamed, and the header is written by
+pandas. The rows written by pyarrow or polars read back as the same table
+with pandas, but their text differs from to_csv:
+
+- the booleans are written true and false,
+- polars writes the floats in their shortest form (0.00001, 1.5e-7),
+- pyarrow quotes all the strings and writes the floats like polars.
+
+The tables with MultiIndex, mixed object, nested, binary, temporal, uint64
+or float16 columns are written by to_csv. Pass fast=False to write_csv to
+get the to_csv text for all the tables.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+def _column_names(names: list[str]) -> list[str]:
+    """Name the columns of a read table the way pandas does
+
+    :param names: Headers of the CSV file,
+    :return: The headers with the empty and duplicated names renamed
+    """
+    seen = {}
+    columns = []
+    for i, name in enumerate(names):
+        if name == "":
+            name = f"Unnamed: {i}"
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        columns.append(name if count == 0 else f"{name}.{count}")
+    return columns
+
+
+def read_csv(filename: str | Path) -> pd.DataFrame:
+    """Read a CSV file
+
+    :param filename: Path of the file,
+    :return: The read table
+    """
+    if pa is not None:
+        try:
+            table = pacsv.read_csv(
+                filename,
+                convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+        except pa.ArrowInvalid:
+            # empty and ragged files, pandas raises its own errors
+            return pd.read_csv(filename)
+        # pandas keeps the dates and times as strings, and reads the
+        # integers above the int64 range as uint64 where arrow gives floats
+        if any(pa.types.is_temporal(column.type)
+               or (pa.types.is_float64(column.type)
+                   and (pc.max(column).as_py() or 0) >= 2 ** 63)
+               for column in table.columns):
+            return pd.read_csv(filename)
+        frame = table.rename_columns(
+            _column_names(table.column_names)).to_pandas()
+        # arrow gives None for the missing strings and an object column for
+        # the empty columns, pandas gives NaN
+        for name, column in zip(frame.columns, table.columns):
+            if pa.types.is_null(column.type):
+                frame[name] = frame[name].astype("float64")
+            elif pa.types.is_string(column.type) and column.null_count:
+                frame[name] = frame[name].where(frame[name].notna(), np.nan)
+        return frame
+    return pd.read_csv(filename)
+
+
+def _pandas_formatted(data_type: "pa.DataType") -> bool:
+    """Check if the values of an arrow type must be formatted by pandas
+
+    :param data_type: Type of a column,
+    :return: True when the arrow writers fail on the type, or write it
+             differently from pandas
+    """
+    if pa.types.is_dictionary(data_type):
+        return _pandas_formatted(data_type.value_type)
+    # the writers fail on the nested and binary columns or write raw
+    # bytes, and write the dates and durations differently from pandas.
+    # The float16 and uint64 columns are also left to pandas.
+    return pa.types.is_nested(data_type) \
+        or pa.types.is_binary(data_type) \
+        or pa.types.is_large_binary(data_type) \
+        or pa.types.is_fixed_size_binary(data_type) \
+        or pa.types.is_temporal(data_type) \
+        or pa.types.is_uint64(data_type) \
+        or pa.types.is_float16(data_type)
+
+
+def _arrow_table(table: pd.DataFrame | pd.Series) -> "pa.Table | None":
+    """Convert a table to arrow, with its index as the first column
+
+    :param table: Table to convert,
+    :return: The arrow table, None when pandas must format the table
+    """
+    if isinstance(table, pd.Series):
+        # to_csv writes a series as a one column table, with a "0" header
+        # when it is unnamed
+        table = table.to_frame(0 if table.name is None else table.name)
+    if isinstance(table.index, pd.MultiIndex) \
+            or isinstance(table.columns, pd.MultiIndex):
+        return None
+    try:
+        arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+        arrow_table = arrow_table.add_column(
+            0, str(table.index.name or ""), pa.array(table.index))
+    except (pa.ArrowException, TypeError, ValueError):
+        # mixed object columns, pandas formats them with str()
+        return None
+    if any(_pandas_formatted(field.type) for field in arrow_table.schema):
+        return None
+    return arrow_table
+
+
+def _integral_floats(table: "pa.Table") -> bool:
+    """Check if a float column only has integer values
+
+    :param table: Arrow table to write,
+    :return: True when arrow would write a float column as integers
+    """
+    for column in table.columns:
+        if pa.types.is_floating(column.type) and pc.all(
+                pc.equal(column, pc.floor(column))).as_py():
+            return True
+    return False
+
+
+def write_csv(filename: str | Path, table: pd.DataFrame | pd.Series,
+              fast: bool = True):
+    """Write a table into a CSV file
+
+    The table is written to a temporary file which then replaces the file,
+    so an interrupted write leaves the previous table. The data is not
+    synced to disk.
+
+    :param filename: Path of the file,
+    :param table: Table to write,
+    :param fast: False to write the rows with pandas to_csv
+    """
+    tmp_filename = f"{filename}.tmp"
+    arrow_table = _arrow_table(table) if fast and pa is not None else None
+    if arrow_table is not None and pl is None \
+            and _integral_floats(arrow_table):
+        # arrow writes 1.0 as 1, the column would be read as integers
+        arrow_table = None
+    try:
+        if arrow_table is None:
+            table.to_csv(tmp_filename)
+        else:
+            with open(tmp_filename, "wb") as csv_file:
+                # arrow quotes the headers and polars renames the empty and
+                # duplicated ones, pandas writes the header
+                csv_file.write(table.iloc[:0].to_csv().encode("utf-8"))
+                if pl is None:
+                    pacsv.write_csv(arrow_table, csv_file,
+                                    pacsv.WriteOptions(include_header=False))
+                else:
+                    rows = arrow_table.rename_columns(
+                        [str(i) for i in range(arrow_table.num_columns)])
+                    pl.from_arrow(rows).write_csv(csv_file,
+                                                  include_header=False)
+    except BaseException:
+        try:
+            os.remove(tmp_filename)
+        except FileNotFoundError:
+            pass
+        raise
+    os.replace(tmp_filename, filename)
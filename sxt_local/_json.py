@@ -0,0 +1,74 @@
+"""JSON files serialization, using orjson when it is installed"""
+import os
+from pathlib import Path
+
+try:
+    import orjson
+
+    def loads(data: bytes | str) -> any:
+        """Parse a JSON document
+
+        :param data: Serialized JSON,
+        :return: The parsed content
+        """
+        return orjson.loads(data)
+
+    def dumps(content: any) -> bytes:
+        """Serialize a content to JSON
+
+        :param content: Content to serialize,
+        :return: The UTF-8 encoded JSON document
+        """
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+except ImportError:
+    import json
+
+    def loads(data: bytes | str) -> any:
+        """Parse a JSON document
+
+        :param data: Serialized JSON,
+        :return: The parsed content
+        """
+        return json.loads(data)
+
+    def dumps(content: any) -> bytes:
+        """Serialize a content to JSON
+
+        :param content: Content to serialize,
+        :return: The UTF-8 encoded JSON document
+        """
+        return json.dumps(content).encode('utf-8')
+
+
+def read_json(filename: str | Path) -> any:
+    """Read a JSON file
+
+    :param filename: Path of the file,
+    :return: The parsed content
+    """
+    with open(filename, "rb") as json_file:
+        return loads(json_file.read())
+
+
+def write_json(filename: str | Path, content: any):
+    """Write a content into a JSON file
+
+    The content is written to a temporary file which then replaces the
+    file, so an interrupted write leaves the previous content. The data is
+    not synced to disk.
+
+    :param filename: Path of the file,
+    :param content: Content to serialize
+    """
+    tmp_filename = f"{filename}.tmp"
+    try:
+        with open(tmp_filename, "wb") as json_file:
+            json_file.write(dumps(content))
+    except BaseException:
+        try:
+            os.remove(tmp_filename)
+        except FileNotFoundError:
+            pass
+        raise
+    os.replace(tmp_filename, filename)
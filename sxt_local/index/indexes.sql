@@ -0,0 +1,8 @@
+-- Indexes used by the annotation queries
+CREATE INDEX IF NOT EXISTS idx_data_ann_kv ON data_annotation(key_id, value, data_id);
+CREATE INDEX IF NOT EXISTS idx_loc_ann_kv ON location_annotation(key_id, value, location_id);
+CREATE INDEX IF NOT EXISTS idx_data_ann_data ON data_annotation(data_id);
+CREATE INDEX IF NOT EXISTS idx_annotation_key_name ON annotation_key(name);
+CREATE INDEX IF NOT EXISTS idx_data_uri ON data(uri);
+CREATE INDEX IF NOT EXISTS idx_data_location ON data(location_id);
+CREATE INDEX IF NOT EXISTS idx_data_type ON data(type_id);
@@ -1,6 +1,10 @@
 """Implementation of the local index plugin"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import deepcopy
+from itertools import groupby
 from pathlib import Path
-import json
+import os
 from sqlite3 import connect, Connection
 
 import pandas as pd
@@ -11,19 +15,33 @@ from scixtracer.models import Location
 from scixtracer.models import DataInfo
 from scixtracer.index import SxIndex
 
+from .._json import loads, read_json, write_json
+from .pool import ConnectionPool
+from .queries import configure_connection
+from .queries import forget_connection
+from .queries import transaction
 from .queries import init_database
+from .queries import optimize_database
 from .queries import insert_location
 from .queries import insert_location_annotation
+from .queries import insert_location_annotations_many
 from .queries import insert_data_annotation
+from .queries import insert_data_annotations_many
+from .queries import insert_data_annotations_bulk
 from .queries import insert_data
+from .queries import insert_data_many
 from .queries import query_location
 from .queries import query_data_annotation
 from .queries import query_locations_annotation
 from .queries import query_data_at
 from .queries import query_data_with_annotations
+from .queries import query_data_with_annotations_grouped
 from .queries import query_view_locations
 from .queries import query_view_data
+from .queries import query_view_locations_arrow
+from .queries import query_view_data_arrow
 from .queries import query_data_tuples
+from .queries import data_tuples_columns
 from .queries import query_delete
 from .queries import query_data_from_uri
 
@@ -31,23 +49,81 @@ from .queries import query_data_from_uri
 class SxIndexLocal(SxIndex):
     """SciXTracer local using sqlite"""
 
+    max_connections = 32
+    cached_statements = 256
+    reader_pool_size = 4
+
     def __init__(self):
         self.__workspace = None
-        self.__conn: dict[str, Connection] = {}
+        self.__workspace_abs = None
+        self.__conn: OrderedDict[str, Connection] = OrderedDict()
+        self.__readers: OrderedDict[str, ConnectionPool] = OrderedDict()
+        self.__ds_dir: dict[str, str] = {}
+        self.__dataset_meta: dict[str, Dataset] = {}
+        self.__description: dict[str, dict[str, any]] = {}
 
     def __del__(self):
-        for conn in self.__conn.values():
-            if isinstance(conn, Connection):
-                conn.close()
+        self.close()
 
     def connect(self, workspace: str = None, **kwargs):
         """Initialize the database connection
 
-        :param workspace: Path to the dataset workspace
+        The connections to the datasets of a previous workspace are closed,
+        they are keyed by the dataset URIs which are relative to it.
+
+        :param workspace: Path to the dataset workspace,
+        :param max_connections: Maximum number of dataset connections
+                                kept open
+        """
+        self.close()
+        if "max_connections" in kwargs:
+            self.max_connections = int(kwargs["max_connections"])
+        self.__workspace = Path(workspace)
+        self.__workspace_abs = None
+        self.__ds_dir.clear()
+        self.__dataset_meta.clear()
+        self.__description.clear()
+        self.__workspace.mkdir(parents=True, exist_ok=True)
+
+    def __workspace_dir(self) -> Path:
+        """Get the absolute path of the workspace
+
+        :return: The resolved workspace path
+        """
+        if self.__workspace_abs is None:
+            self.__workspace_abs = self.__workspace.resolve()
+        return self.__workspace_abs
+
+    def close(self):
+        """Close all the opened dataset connections"""
+        for pool in self.__readers.values():
+            pool.close()
+        self.__readers.clear()
+        for conn in self.__conn.values():
+            self.__close_connection(conn)
+        self.__conn.clear()
+
+    @staticmethod
+    def __close_connection(conn: Connection):
+        """Let SQLite update its statistics and close a connection
+
+        :param conn: Connection to close
+        """
+        conn.execute("PRAGMA optimize")
+        forget_connection(conn)
+        conn.close()
+
+    def optimize(self, dataset: Dataset):
+        """Optimize the dataset index for the queries
+
+        It adds the indexes missing from datasets created by previous
+        versions and gathers statistics for the query planner. It should
+        be called after large imports.
+
+        :param dataset: Dataset to optimize
         """
-        self.__workspace = Path(workspace).resolve()
-        if not self.__workspace.exists():
-            self.__workspace.mkdir(parents=True, exist_ok=True)
+        conn = self.__writer(dataset.uri)
+        optimize_database(conn)
 
     def datasets(self) -> pd.DataFrame:
         """Get the list of available datasets
@@ -55,16 +131,21 @@ class SxIndexLocal(SxIndex):
         :return: The info of available dataset in the workspace
         """
         content = []
-        for x in self.__workspace.iterdir():
-            if x.is_dir() and (x / "info.json").exists():
-                dataset_info={"uri": x.name, "name": "", "description": ""}
-                desc_file = x / "info.json"
-                with open(desc_file, "r", encoding='utf-8') as file:
-                    data = json.load(file)
-                    if 'name' in data:
-                        dataset_info['name'] = data["name"]
-                    if 'description' in data:
-                        dataset_info['description'] = data["description"]
+        with os.scandir(self.__workspace_dir()) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                desc_file = os.path.join(entry.path, "info.json")
+                try:
+                    with open(desc_file, "rb") as file:
+                        data = loads(file.read())
+                except FileNotFoundError:
+                    continue
+                dataset_info={"uri": entry.name, "name": "", "description": ""}
+                if 'name' in data:
+                    dataset_info['name'] = data["name"]
+                if 'description' in data:
+                    dataset_info['description'] = data["description"]
                 content.append(dataset_info)
 
         return pd.DataFrame(content, columns=["uri", "name", "description"])
@@ -75,19 +156,17 @@ class SxIndexLocal(SxIndex):
         :param dataset: Information of the dataset,
         :param metadata: Metadata to set
         """
-        filename = Path(self.__workspace) / dataset.uri.value
-        desc_filename = filename / "description.json"
-        info_filename = filename / "info.json"
+        dataset_dir = self.__dataset_dir(dataset.uri)
+        desc_filename = os.path.join(dataset_dir, "description.json")
+        info_filename = os.path.join(dataset_dir, "info.json")
 
         if "description" in metadata:
-            with open(str(info_filename), "r", encoding='utf-8') as json_file:
-                data = json.load(json_file)
-                data['description'] = metadata["description"]
-            with open(str(info_filename), "w", encoding='utf-8') as json_file:
-                json.dump(data, json_file)
+            data = read_json(info_filename)
+            data['description'] = metadata["description"]
+            write_json(info_filename, data)
 
-        with open(str(desc_filename), "w", encoding='utf-8') as json_file:
-            json.dump(metadata, json_file)
+        write_json(desc_filename, metadata)
+        self.__description[dataset.uri.value] = deepcopy(metadata)
 
     def get_description(self, dataset: Dataset) -> dict[str, any]:
         """Read the metadata of a dataset
@@ -95,55 +174,155 @@ class SxIndexLocal(SxIndex):
         :param dataset: Information of the dataset,
         :return: The dataset metadata
         """
-        filename = Path(self.__workspace) / dataset.uri.value
-        filename = filename / "description.json"
-        with open(str(filename), "r", encoding='utf-8') as json_file:
-            return json.load(json_file)
+        description = self.__description.get(dataset.uri.value)
+        if description is None:
+            filename = os.path.join(self.__dataset_dir(dataset.uri),
+                                    "description.json")
+            description = read_json(filename)
+            self.__description[dataset.uri.value] = description
+        return deepcopy(description)
+
+    def __dataset_dir(self, uri: URI) -> str:
+        """Get the directory of a dataset
+
+        :param uri: Unique identifier of the dataset
+        :return: The path of the dataset directory
+        """
+        dataset_dir = self.__ds_dir.get(uri.value)
+        if dataset_dir is None:
+            dataset_dir = os.fspath(self.__workspace_dir() / uri.value)
+            self.__ds_dir[uri.value] = dataset_dir
+        return dataset_dir
 
-    def __get_connection(self, uri: URI) -> Connection:
-        """Get the connection to the dataset index
+    def __writer(self, uri: URI) -> Connection:
+        """Get the read-write connection to the dataset index
 
         :param uri: Unique identifier of the dataset
         :return: The connection to the database
         """
-        db_file = self.__workspace / uri.value / "index.db"
         if uri.value in self.__conn:
+            self.__conn.move_to_end(uri.value)
             return self.__conn[uri.value]
-        conn = connect(db_file)
+        db_file = os.path.join(self.__dataset_dir(uri), "index.db")
+        while len(self.__conn) >= self.max_connections:
+            self.__close_connection(self.__conn.popitem(last=False)[1])
+        conn = connect(db_file, check_same_thread=False, isolation_level=None,
+                       cached_statements=self.cached_statements)
+        configure_connection(conn)
         self.__conn[uri.value] = conn
         return conn
 
+    def __reader(self, uri: URI):
+        """Check out a read-only connection to the dataset index
+
+        Queries use their own connections so that in WAL mode they do not
+        wait for the writer lock. They are pooled per dataset, so that
+        concurrent threads do not share a connection.
+
+        :param uri: Unique identifier of the dataset
+        :return: A context manager giving the connection to the database
+        """
+        if uri.value in self.__readers:
+            self.__readers.move_to_end(uri.value)
+            return self.__readers[uri.value].checkout()
+        if uri.value not in self.__conn:
+            # make sure the database exists and is in WAL mode
+            self.__writer(uri)
+        db_file = Path(self.__dataset_dir(uri), "index.db")
+        while len(self.__readers) >= self.max_connections:
+            self.__readers.popitem(last=False)[1].close()
+
+        def open_reader() -> Connection:
+            conn = connect(f"{db_file.as_uri()}?mode=ro", uri=True,
+                           check_same_thread=False, isolation_level=None,
+                           cached_statements=self.cached_statements)
+            configure_connection(conn, read_only=True)
+            return conn
+
+        pool = ConnectionPool(open_reader, self.reader_pool_size)
+        self.__readers[uri.value] = pool
+        return pool.checkout()
+
+    def __close_readers(self, uri: URI):
+        """Close the query connections to a dataset index
+
+        :param uri: Unique identifier of the dataset
+        :raises RuntimeError: if a query of the dataset is running
+        """
+        pool = self.__readers.get(uri.value)
+        if pool is None:
+            return
+        try:
+            pool.drain()
+        except RuntimeError as err:
+            raise RuntimeError(f"The index of the dataset {uri.value} is "
+                               "being queried") from err
+        del self.__readers[uri.value]
+
     def new_dataset(self, name: str) -> Dataset:
         """Create a new dataset
 
         :param name: Title of the dataset
         """
         # create the folder
-        dataset_uri = name.replace(" ", "_").lower()
-        dataset_path = self.__workspace / dataset_uri
-        if dataset_path.exists():
+        dataset_uri = URI(value=name.replace(" ", "_").lower())
+        dataset_path = self.__dataset_dir(dataset_uri)
+        if os.path.exists(dataset_path):
             raise ValueError("A dataset with the same name already exists")
-        dataset_path.mkdir(parents=True, exist_ok=False)
+        os.makedirs(dataset_path)
         # create name
-        name_file = dataset_path / "info.json"
-        with open(name_file, "w", encoding="utf-8") as fp:
-            json.dump({"name": name}, fp)
+        name_file = os.path.join(dataset_path, "info.json")
+        write_json(name_file, {"name": name})
         # Init the database
-        conn = self.__get_connection(URI(value=dataset_uri))
+        conn = self.__writer(dataset_uri)
         init_database(conn)
-        self.__conn[dataset_path] = conn
-        return Dataset(name=name, uri=URI(value=dataset_uri))
+        dataset = Dataset(name=name, uri=dataset_uri)
+        self.__dataset_meta[dataset_uri.value] = dataset
+        return dataset
+
+    @contextmanager
+    def bulk_load(self, dataset: Dataset):
+        """Context to quickly populate a dataset index
+
+        Journaling, fsync and foreign keys checks are disabled while the
+        context is active and restored on exit. A crash during the bulk
+        load can corrupt the index, so it should only be used when the
+        dataset can be recreated from scratch.
+
+        Changing the journal mode needs the only connection to the index,
+        so the idle query connections are closed on entry and exit, and
+        they are reopened by the next queries.
+
+        :param dataset: Dataset to populate
+        :raises RuntimeError: if a query of the dataset is running
+        """
+        conn = self.__writer(dataset.uri)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        self.__close_readers(dataset.uri)
+        conn.executescript("""PRAGMA journal_mode=OFF;
+                              PRAGMA synchronous=OFF;
+                              PRAGMA foreign_keys=OFF;""")
+        try:
+            yield self
+        finally:
+            self.__close_readers(dataset.uri)
+            conn.executescript(f"""PRAGMA journal_mode={journal_mode};
+                                   PRAGMA synchronous={synchronous};
+                                   PRAGMA foreign_keys={foreign_keys};""")
 
     def get_dataset(self, uri: URI) -> Dataset:
         """Read the information of a dataset
 
         :param uri: Unique identifier of the dataset
         """
-        name_file = self.__workspace / uri.value / "info.json"
-        with open(name_file, "r", encoding="utf-8") as fp:
-            d = json.load(fp)
-            name = d["name"]
-        return Dataset(name=name, uri=uri)
+        dataset = self.__dataset_meta.get(uri.value)
+        if dataset is None:
+            name_file = os.path.join(self.__dataset_dir(uri), "info.json")
+            dataset = Dataset(name=read_json(name_file)["name"], uri=uri)
+            self.__dataset_meta[uri.value] = dataset
+        return dataset
 
     def new_location(self,
                      dataset: Dataset,
@@ -155,13 +334,12 @@ class SxIndexLocal(SxIndex):
         :param annotations: Annotations associated to the location,
         :return: The newly created location
         """
-        conn = self.__get_connection(dataset.uri)
-        uuid = insert_location(conn)
-        location = Location(dataset=dataset, uuid=uuid)
-        if annotations is not None:
-            for key, value in annotations.items():
-                self.annotate_location(location, key, value)
-        return location
+        conn = self.__writer(dataset.uri)
+        with transaction(conn):
+            uuid = insert_location(conn)
+            if annotations:
+                insert_location_annotations_many(conn, uuid, annotations)
+        return Location(dataset=dataset, uuid=uuid)
 
     def annotate_location(self,
                           location: Location,
@@ -173,8 +351,22 @@ class SxIndexLocal(SxIndex):
         :param key: Annotation key,
         :param value: Annotation value
         """
-        conn = self.__get_connection(location.dataset.uri)
-        insert_location_annotation(conn, location.uuid, key, value)
+        conn = self.__writer(location.dataset.uri)
+        with transaction(conn):
+            insert_location_annotation(conn, location.uuid, key, value)
+
+    def annotate_location_many(self,
+                               location: Location,
+                               annotations: dict[str, str | int | float | bool]
+                               ):
+        """Annotate a location with several key value pairs at once
+
+        :param location: Location to annotate,
+        :param annotations: Annotations as key value pairs
+        """
+        conn = self.__writer(location.dataset.uri)
+        with transaction(conn):
+            insert_location_annotations_many(conn, location.uuid, annotations)
 
     def annotate_data(self,
                       data_info: DataInfo,
@@ -186,8 +378,22 @@ class SxIndexLocal(SxIndex):
         :param key: Annotation key,
         :param value: Annotation value
         """
-        conn = self.__get_connection(data_info.dataset.uri)
-        insert_data_annotation(conn, data_info.uri, key, value)
+        conn = self.__writer(data_info.location.dataset.uri)
+        with transaction(conn):
+            insert_data_annotation(conn, data_info.uri.value, key, value)
+
+    def annotate_data_many(self,
+                           data_info: DataInfo,
+                           annotations: dict[str, str | int | float | bool]):
+        """Annotate a data with several key value pairs at once
+
+        :param data_info: Information of the data,
+        :param annotations: Annotations as key value pairs
+        """
+        conn = self.__writer(data_info.location.dataset.uri)
+        with transaction(conn):
+            insert_data_annotations_many(conn, data_info.uri.value,
+                                         annotations)
 
     def create_data(self,
                     location: Dataset | Location,
@@ -205,27 +411,77 @@ class SxIndexLocal(SxIndex):
         :param metadata_uri: The URI of the metadata,
         :return: The data information
         """
-        if isinstance(location, Dataset):
-            conn = self.__get_connection(location.uri)
-            location_id = insert_location(conn)
-            data_location = Location(dataset=location, uuid=location_id)
-        else:
-            conn = self.__get_connection(location.dataset.uri)
-            location_id = location.uuid
-            data_location = location
-
         metadata_str = ""
         if metadata_uri is not None:
             metadata_str = metadata_uri.value
 
-        insert_data(conn, location_id, uri.value, storage_type, metadata_str)
-        for key, value in annotations.items():
-            insert_data_annotation(conn, uri.value, key, value)
+        if isinstance(location, Dataset):
+            conn = self.__writer(location.uri)
+        else:
+            conn = self.__writer(location.dataset.uri)
+
+        with transaction(conn):
+            if isinstance(location, Dataset):
+                location_id = insert_location(conn)
+                data_location = Location(dataset=location, uuid=location_id)
+            else:
+                location_id = location.uuid
+                data_location = location
+
+            insert_data(conn, location_id, uri.value, storage_type,
+                        metadata_str)
+            if annotations:
+                insert_data_annotations_many(conn, uri.value, annotations)
         return DataInfo(location=data_location,
                         storage_type=storage_type,
                         metadata_uri=metadata_uri,
                         uri=uri)
 
+    def create_data_batch(self,
+                          location: Dataset | Location,
+                          rows: list[tuple[URI, str, dict[str, any]]],
+                          metadata_uris: list[URI] = None
+                          ) -> list[DataInfo]:
+        """Create several data at the same location in a single transaction
+
+        :param location: Location where to save the data. A new location is
+                         created if it is a dataset,
+        :param rows: (URI, storage type, annotations) of each data,
+        :param metadata_uris: The URIs of the data metadata, in the rows
+                              order,
+        :return: The data information in the rows order
+        """
+        if metadata_uris is None:
+            metadata_uris = [None] * len(rows)
+        data_rows = [(uri.value, storage_type,
+                      meta.value if meta is not None else "")
+                     for (uri, storage_type, _), meta
+                     in zip(rows, metadata_uris)]
+        ann_rows = [(uri.value, key, value)
+                    for uri, _, annotations in rows
+                    if annotations is not None
+                    for key, value in annotations.items()]
+
+        if isinstance(location, Dataset):
+            conn = self.__writer(location.uri)
+        else:
+            conn = self.__writer(location.dataset.uri)
+
+        with transaction(conn):
+            if isinstance(location, Dataset):
+                data_location = Location(dataset=location,
+                                         uuid=insert_location(conn))
+            else:
+                data_location = location
+            insert_data_many(conn, data_location.uuid, data_rows)
+            if ann_rows:
+                insert_data_annotations_bulk(conn, ann_rows)
+        return [DataInfo(location=data_location,
+                         storage_type=storage_type,
+                         metadata_uri=meta,
+                         uri=uri)
+                for (uri, storage_type, _), meta in zip(rows, metadata_uris)]
+
     def get_data_info(self, dataset: Dataset, data_uri: URI) -> DataInfo | None:
         """Read the data information from it URI
 
@@ -233,58 +489,88 @@ class SxIndexLocal(SxIndex):
         :param data_uri: URI of the data,
         :return: The information of the data
         """
-        conn = self.__get_connection(dataset.uri)
-        data = query_data_from_uri(conn, data_uri.value)
+        with self.__reader(dataset.uri) as conn:
+            data = query_data_from_uri(conn, data_uri.value)
         if data is not None:
+            metadata_uri = URI(value=data[3]) if data[3] else None
             return DataInfo(location=Location(dataset=dataset, uuid=data[0]),
                             storage_type=data[1],
                             uri=URI(value=data[2]),
-                            metadata_uri=URI(value=data[3]))
+                            metadata_uri=metadata_uri)
 
     def query_data_at(self,
                       dataset: Dataset,
-                      locations: list[Location]) -> list[DataInfo]:
+                      locations: list[Location],
+                      validate: bool = True) -> list[DataInfo]:
         """Get all the data at given locations
 
 
         :param dataset: Dataset to query,
         :param locations: Locations to query,
+        :param validate: False to skip the models validation,
         :return: The list of data information at these locations
         """
-        conn = self.__get_connection(dataset.uri)
         loc_ids = []
         for loc in locations:
             loc_ids.append(loc.uuid)
-        data = query_data_at(conn, loc_ids)
-        out_data = []
-        for dat in data:
-            out_data.append(DataInfo(uri=URI(value=dat[1]),
-                                     storage_type=dat[2],
-                                     metadata_uri=URI(value=dat[3]),
-                                     location=Location(uuid=dat[0],
-                                                       dataset=dataset)))
-        return out_data
+        with self.__reader(dataset.uri) as conn:
+            data = query_data_at(conn, loc_ids)
+        return self.__data_infos(dataset, data, validate)
 
 
     def query_data_single(self,
                           dataset: Dataset,
-                          annotations: dict[str, any] = None
+                          annotations: dict[str, any] = None,
+                          validate: bool = True
                          ) -> list[DataInfo] | list[list[DataInfo]]:
         """Retrieve data from a dataset
 
         :param dataset: Dataset to query,
         :param annotations: Query data that have the annotations,
+        :param validate: False to skip the models validation when the
+                         results are only read,
         """
-        conn = self.__get_connection(dataset.uri)
-        data = query_data_with_annotations(conn, annotations)
-        out_data = []
-        for dat in data:
-            out_data.append(DataInfo(uri=URI(value=dat[1]),
-                                     storage_type=dat[2],
-                                     metadata_uri=URI(value=dat[3]),
-                                     location=Location(uuid=dat[0],
-                                                       dataset=dataset)))
-        return out_data
+        with self.__reader(dataset.uri) as conn:
+            data = query_data_with_annotations(conn, annotations)
+        return self.__data_infos(dataset, data, validate)
+
+    @staticmethod
+    def __constructor(model: type, validate: bool):
+        """Get the function building a model
+
+        Without validation, pydantic models are built with model_construct
+        which sets the fields as given.
+
+        :param model: Class of the model,
+        :param validate: False to skip the validation,
+        :return: The model constructor
+        """
+        if validate:
+            return model
+        return getattr(model, "model_construct", model)
+
+    @staticmethod
+    def __data_infos(dataset: Dataset,
+                     rows: list[tuple],
+                     validate: bool = True) -> list[DataInfo]:
+        """Build data information from query results
+
+        :param dataset: Dataset the data belong to,
+        :param rows: (location_id, uri, type, metadata_uri) query rows,
+        :param validate: False to skip the models validation,
+        :return: The list of data information
+        """
+        rows = list(rows)
+        uri_ = SxIndexLocal.__constructor(URI, validate)
+        data_info_ = SxIndexLocal.__constructor(DataInfo, validate)
+        location_ = SxIndexLocal.__constructor(Location, validate)
+        locations = {uuid: location_(uuid=uuid, dataset=dataset)
+                     for uuid in {row[0] for row in rows}}
+        return [data_info_(uri=uri_(value=row[1]),
+                           storage_type=row[2],
+                           metadata_uri=uri_(value=row[3]) if row[3] else None,
+                           location=locations[row[0]])
+                for row in rows]
 
     def query_data_loc_set(self,
                            dataset: Dataset,
@@ -296,38 +582,50 @@ class SxIndexLocal(SxIndex):
         :param annotations: Query data that have the annotations,
         :return: List of data tuples matching the conditions
         """
-        conn = self.__get_connection(dataset.uri)
-        data = query_data_tuples(conn, annotations)
+        with self.__reader(dataset.uri) as conn:
+            data = query_data_tuples(conn, annotations)
+        columns = [(data[uri].tolist(),
+                    data[type_].tolist(),
+                    data[metadata].tolist())
+                   for uri, type_, metadata
+                   in data_tuples_columns(len(annotations))]
+        location_ids = data['location_id'].tolist()
+        locations = {uuid: Location(uuid=uuid, dataset=dataset)
+                     for uuid in set(location_ids)}
+        uri_, data_info_ = URI, DataInfo
         data_out = []
-        for _, row in data.iterrows():
-            raw_info = []
-            suffix = ""
-            for i in range(len(annotations)):
-                if i > 0:
-                    suffix = f"_{i}"
-                raw_info.append(
-                    DataInfo(uri=URI(value=row['uri'+suffix]),
-                             storage_type=row['type'+suffix],
-                             metadata_uri=URI(value=row[
-                                 'metadata_uri'+suffix]),
-                             location=Location(uuid=row['location_id'],
-                                               dataset=dataset)))
-            data_out.append(raw_info)
+        for i in range(len(data)):
+            location = locations[location_ids[i]]
+            data_out.append([data_info_(uri=uri_(value=uris[i]),
+                                        storage_type=types[i],
+                                        metadata_uri=uri_(value=metadata[i])
+                                        if metadata[i] else None,
+                                        location=location)
+                             for uris, types, metadata in columns])
         return data_out
 
     def query_data_group_set(self,
                              dataset: Dataset,
-                             annotations: list[dict[str: any]]
+                             annotations: list[dict[str: any]],
+                             validate: bool = True
                              ) -> list[list[DataInfo]]:
         """Retrieve sets of data that share the same type and annotations
 
         :param dataset: Dataset to query,
         :param annotations: Query data that have the annotations,
+        :param validate: False to skip the models validation,
         :return: List of data tuples matching the conditions
         """
-        out_data = []
-        for ann in annotations:
-            out_data.append(self.query_data_single(dataset, annotations=ann))
+        if not annotations:
+            return []
+        if len(annotations) == 1:
+            return [self.query_data_single(dataset, annotations[0],
+                                           validate)]
+        with self.__reader(dataset.uri) as conn:
+            data = query_data_with_annotations_grouped(conn, annotations)
+        out_data = [[] for _ in annotations]
+        for grp, rows in groupby(data, key=lambda row: row[4]):
+            out_data[grp] = self.__data_infos(dataset, rows, validate)
         return out_data
 
     def query_location(self,
@@ -340,12 +638,10 @@ class SxIndexLocal(SxIndex):
         :param annotations: query locations that have the annotations,
         :return: Locations that correspond to the query
         """
-        conn = self.__get_connection(dataset.uri)
-        loc_s = query_location(conn, annotations)
-        locations = []
-        for loc in loc_s:
-            locations.append(Location(uuid=loc[0], dataset=dataset))
-        return locations
+        with self.__reader(dataset.uri) as conn:
+            locations = query_location(conn, annotations)
+        location_ = Location
+        return [location_(uuid=loc[0], dataset=dataset) for loc in locations]
 
     def query_data_annotation(self, dataset: Dataset) -> dict[str, list[any]]:
         """Get all the data annotations in the datasets with their values
@@ -353,8 +649,8 @@ class SxIndexLocal(SxIndex):
         :param dataset: Dataset to query,
         :return: Available annotations with their values
         """
-        conn = self.__get_connection(dataset.uri)
-        return query_data_annotation(conn)
+        with self.__reader(dataset.uri) as conn:
+            return query_data_annotation(conn)
 
     def query_location_annotation(self, dataset: Dataset
                                   ) -> dict[str, list[any]]:
@@ -363,8 +659,8 @@ class SxIndexLocal(SxIndex):
         :param dataset: Dataset to be queried,
         :return: Available locations with their values
         """
-        conn = self.__get_connection(dataset.uri)
-        return query_locations_annotation(conn)
+        with self.__reader(dataset.uri) as conn:
+            return query_locations_annotation(conn)
 
     def view_locations(self, dataset: Dataset) -> pd.DataFrame:
         """Create a table to visualize the dataset locations structure
@@ -372,8 +668,8 @@ class SxIndexLocal(SxIndex):
         :param dataset: Dataset to visualize
         :return: The data view as a table
         """
-        conn = self.__get_connection(dataset.uri)
-        results = query_view_locations(conn)
+        with self.__reader(dataset.uri) as conn:
+            results = query_view_locations(conn)
         return results
 
     def view_data(self,
@@ -386,17 +682,75 @@ class SxIndexLocal(SxIndex):
         :param locations: Locations to filter
         :return: The data view as a table
         """
-        conn = self.__get_connection(dataset.uri)
         loc_ids = []
         if locations is not None:
             loc_ids = [loc.uuid for loc in locations]
-        results = query_view_data(conn, loc_ids)
+        with self.__reader(dataset.uri) as conn:
+            results = query_view_data(conn, loc_ids)
         return results
 
+    def view_locations_arrow(self, dataset: Dataset):
+        """Create an arrow table to visualize the dataset locations structure
+
+        It requires pyarrow, and avoids building the intermediate pandas
+        objects of view_locations.
+
+        :param dataset: Dataset to visualize
+        :return: The locations view as a pyarrow.Table
+        """
+        with self.__reader(dataset.uri) as conn:
+            return query_view_locations_arrow(conn)
+
+    def view_data_arrow(self,
+                        dataset: Dataset,
+                        locations: list[Location] = None):
+        """Create an arrow table to visualize the dataset data structure
+
+        It requires pyarrow, and builds the view with a single query
+        instead of one query per annotation key.
+
+        :param dataset: Dataset to visualize
+        :param locations: Locations to filter
+        :return: The data view as a pyarrow.Table
+        """
+        loc_ids = []
+        if locations is not None:
+            loc_ids = [loc.uuid for loc in locations]
+        with self.__reader(dataset.uri) as conn:
+            return query_view_data_arrow(conn, loc_ids)
+
+    def view_locations_pl(self, dataset: Dataset):
+        """Create a polars frame to visualize the dataset locations structure
+
+        It requires polars and pyarrow. The frame wraps the arrow table of
+        view_locations_arrow without copy.
+
+        :param dataset: Dataset to visualize
+        :return: The locations view as a polars.LazyFrame
+        """
+        import polars as pl  # pylint: disable=import-outside-toplevel
+        return pl.from_arrow(self.view_locations_arrow(dataset)).lazy()
+
+    def view_data_pl(self,
+                     dataset: Dataset,
+                     locations: list[Location] = None):
+        """Create a polars frame to visualize the dataset data structure
+
+        It requires polars and pyarrow. The frame wraps the arrow table of
+        view_data_arrow without copy.
+
+        :param dataset: Dataset to visualize
+        :param locations: Locations to filter
+        :return: The data view as a polars.LazyFrame
+        """
+        import polars as pl  # pylint: disable=import-outside-toplevel
+        return pl.from_arrow(self.view_data_arrow(dataset, locations)).lazy()
+
     def delete(self, data_info: DataInfo):
         """Delete a data
 
         :param data_info: Info of the data to delete
         """
-        conn = self.__get_connection(data_info.location.dataset.uri)
-        query_delete(conn, data_info.uri.value)
+        conn = self.__writer(data_info.location.dataset.uri)
+        with transaction(conn):
+            query_delete(conn, data_info.uri.value)
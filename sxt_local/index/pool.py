@@ -0,0 +1,83 @@
+"""Pool of reusable SQLite connections"""
+from contextlib import contextmanager
+from queue import Empty, Full, Queue
+from sqlite3 import Connection
+from threading import Lock
+from typing import Callable
+
+
+class ConnectionPool:
+    """Thread safe pool of connections to a database
+
+    Connections are created on demand by the factory, with their pragmas
+    already set, and returned to the pool after use. Checking out never
+    blocks: a new connection is opened when all the pooled ones are in
+    use, and closed on release if the pool is already full.
+
+    :param factory: Function opening a new connection,
+    :param size: Maximum number of idle connections kept in the pool
+    """
+    def __init__(self, factory: Callable[[], Connection], size: int = 4):
+        self.__factory = factory
+        self.__idle: Queue[Connection] = Queue(maxsize=size)
+        self.__closed = False
+        self.__lock = Lock()
+        self.__in_use = 0
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a connection for the enclosed statements
+
+        The connection must not be used outside of the with block.
+        """
+        with self.__lock:
+            self.__in_use += 1
+        conn = None
+        try:
+            try:
+                conn = self.__idle.get_nowait()
+            except Empty:
+                conn = self.__factory()
+            yield conn
+        finally:
+            if conn is not None:
+                self.__release(conn)
+            with self.__lock:
+                self.__in_use -= 1
+
+    def __release(self, conn: Connection):
+        """Give a connection back to the pool
+
+        :param conn: Connection to release
+        """
+        if self.__closed:
+            conn.close()
+            return
+        try:
+            self.__idle.put_nowait(conn)
+        except Full:
+            conn.close()
+
+    def drain(self):
+        """Close the pool, which must not have connections checked out
+
+        :raises RuntimeError: if connections are still in use
+        """
+        with self.__lock:
+            if self.__in_use:
+                raise RuntimeError(
+                    f"{self.__in_use} connections of the pool are still in "
+                    "use")
+            self.close()
+
+    def close(self):
+        """Close the idle connections
+
+        The connections still checked out are closed on release.
+        """
+        self.__closed = True
+        while True:
+            try:
+                self.__idle.get_nowait().close()
+            except Empty:
+                break
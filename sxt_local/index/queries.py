@@ -1,4 +1,5 @@
 """Implementation of SQLite queries"""
+from contextlib import contextmanager
 import os
 from sqlite3 import Connection, OperationalError
 
@@ -6,6 +7,39 @@ import pandas as pd
 from scixtracer.logger import logger
 
 
+# Statements run on every insert. sqlite3 keeps the prepared statements
+# of a connection in a cache keyed by the SQL text (see the
+# cached_statements argument of sqlite3.connect), so the hot queries are
+# shared constants with bound parameters, compiled once per connection.
+_SELECT_ANNOTATION_KEY = "SELECT id FROM annotation_key WHERE name=?"
+_INSERT_ANNOTATION_KEY = "INSERT INTO annotation_key (name) VALUES (?)"
+_INSERT_LOCATION_ANNOTATION = """INSERT INTO location_annotation
+                                 (location_id, key_id, value)
+                                 VALUES (?, ?, ?)"""
+_INSERT_DATA_ANNOTATION = """INSERT INTO data_annotation
+                             (data_id, key_id, value)
+                             VALUES ((SELECT id FROM data WHERE uri=?),
+                                     ?, ?)"""
+_SELECT_STORAGE_TYPE = "SELECT id FROM storage_type WHERE name=?"
+_INSERT_DATA = """INSERT INTO data (location_id, type_id, uri, metadata_uri)
+                  VALUES (?, ?, ?, ?)"""
+_SELECT_DATA_FROM_URI = """SELECT data.location_id, storage_type.name,
+                                  data.uri, data.metadata_uri
+                           FROM data
+                           INNER JOIN storage_type
+                               ON storage_type.id = data.type_id
+                           WHERE data.uri = ?"""
+
+# Number of parameters bound to a single statement at most
+_MAX_VARIABLES = 999
+
+# IDs of the storage types and annotation keys of each connection, keyed
+# by id(conn). Keys are never deleted, so the cached IDs stay valid until
+# forget_connection is called when the connection is closed.
+_storage_type_cache: dict[int, dict[str, int]] = {}
+_annotation_key_cache: dict[int, dict[str, int]] = {}
+
+
 def __fetchall(conn: Connection,
                sql: str,
                parameters: list[float | int | bool | str | None] = None):
@@ -16,12 +50,9 @@ def __fetchall(conn: Connection,
     :param parameters: query arguments
     :return the query result
     """
-    cur = conn.cursor()
     if parameters is not None:
-        cur.execute(sql, parameters)
-    else:
-        cur.execute(sql)
-    return cur.fetchall()
+        return conn.execute(sql, parameters).fetchall()
+    return conn.execute(sql).fetchall()
 
 
 def __fetchone(conn: Connection,
@@ -33,47 +64,122 @@ def __fetchone(conn: Connection,
     :param sql: SQL query
     :param parameters: list of query parameters
     """
-    cur = conn.cursor()
     if parameters is not None:
-        cur.execute(sql, parameters)
-    else:
-        cur.execute(sql)
-    return cur.fetchone()
+        return conn.execute(sql, parameters).fetchone()
+    return conn.execute(sql).fetchone()
+
+
+def configure_connection(conn: Connection, read_only: bool = False):
+    """Set the pragmas of a new connection
+
+    Read-write connections switch the database to WAL mode, where
+    readers do not block on the writer, and only fsync at checkpoints
+    with synchronous=NORMAL.
+
+    :param conn: Connection to the database,
+    :param read_only: True if the connection is opened in read-only mode
+    """
+    if not read_only:
+        conn.executescript("""PRAGMA journal_mode=WAL;
+                              PRAGMA synchronous=NORMAL;""")
+    conn.executescript("""PRAGMA busy_timeout=5000;
+                          PRAGMA temp_store=MEMORY;
+                          PRAGMA cache_size=-65536;
+                          PRAGMA foreign_keys=ON;""")
+
+
+def forget_connection(conn: Connection):
+    """Drop the cached IDs of a connection before closing it
+
+    :param conn: Connection to the database
+    """
+    _storage_type_cache.pop(id(conn), None)
+    _annotation_key_cache.pop(id(conn), None)
+
+
+@contextmanager
+def transaction(conn: Connection):
+    """Run the enclosed statements in a single write transaction
+
+    The connection is expected to be in autocommit mode
+    (isolation_level=None). The write lock is taken upfront with
+    BEGIN IMMEDIATE, and the transaction is rolled back on error.
+
+    :param conn: Connection to the database
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        # the annotation keys inserted by the transaction are gone
+        _annotation_key_cache.pop(id(conn), None)
+        raise
+    conn.commit()
 
 
 def init_database(conn: Connection):
     """Initialize the database
 
+    The schema and the indexes are created in a single transaction.
+
     :param conn: Connection to the database
     """
+    script = "\n".join([__read_sql_file('schema.sql'),
+                        __read_sql_file('indexes.sql')])
+    try:
+        conn.executescript(f"BEGIN;\n{script}\nCOMMIT;")
+    except OperationalError as err:
+        if conn.in_transaction:
+            conn.rollback()
+        logger().error(f"Sqlite operational error: {str(err)}")
+        raise ValueError from err
+
+
+def optimize_database(conn: Connection):
+    """Create the missing indexes and refresh the query planner statistics
+
+    :param conn: Connection to the database
+    """
+    __run_sql_file(conn, 'indexes.sql')
+    conn.execute("ANALYZE")
+
+
+def __read_sql_file(name: str) -> str:
+    """Read a SQL file of the package
+
+    :param name: Name of the SQL file,
+    :return: The SQL commands
+    """
     root = os.path.dirname(os.path.abspath(__file__))
-    filename = os.path.join(root, 'schema.sql')
+    filename = os.path.join(root, name)
     with open(filename, 'r', encoding='utf-8') as fd_:
-        sql_file = fd_.read()
+        return fd_.read()
+
+
+def __run_sql_file(conn: Connection, name: str):
+    """Run the SQL commands of a file of the package
 
-    cur = conn.cursor()
-    sql_commands = sql_file.split(';')
-    for command in sql_commands:
-        try:
-            cur.execute(command)
-            if 'INSERT' in command:
-                conn.commit()
-        except OperationalError as err:
-            logger().error(f"Sqlite operational error: {str(err)}")
-            raise ValueError from err
+    :param conn: Connection to the database,
+    :param name: Name of the SQL file
+    """
+    try:
+        conn.executescript(__read_sql_file(name))
+    except OperationalError as err:
+        logger().error(f"Sqlite operational error: {str(err)}")
+        raise ValueError from err
 
 
 def insert_location(conn: Connection) -> int:
     """Add a new location to the database
 
+    The caller is responsible for committing the transaction.
+
     :param conn: Connection to the database
     :return: the ID of the new location
     """
     sql = '''INSERT INTO location DEFAULT VALUES'''
-    curr = conn.cursor()
-    curr.execute(sql)
-    conn.commit()
-    return int(curr.lastrowid)
+    return int(conn.execute(sql).lastrowid)
 
 
 def insert_annotation_key(conn: Connection, key: str) -> int:
@@ -83,36 +189,73 @@ def insert_annotation_key(conn: Connection, key: str) -> int:
     :param key: Name of the annotation
     :return: the ID of the new or already existing annotation
     """
-    sql = """SELECT id FROM annotation_key WHERE name=?"""
-    ann_id = __fetchone(conn, sql, [key])
+    cache = _annotation_key_cache.setdefault(id(conn), {})
+    if key in cache:
+        return cache[key]
+    ann_id = __fetchone(conn, _SELECT_ANNOTATION_KEY, [key])
     if ann_id is None:
-        sql = """INSERT INTO annotation_key (name) VALUES (?)"""
-        cur = conn.cursor()
-        cur.execute(sql, [key])
-        conn.commit()
-        ann_id = cur.lastrowid
+        ann_id = conn.execute(_INSERT_ANNOTATION_KEY, [key]).lastrowid
     else:
         ann_id = ann_id[0]
+    cache[key] = ann_id
     return ann_id
 
 
+def insert_annotation_keys(conn: Connection,
+                           keys: list[str]) -> dict[str, int]:
+    """Get the IDs of several annotations, inserting the missing ones
+
+    :param conn: Connection to the database,
+    :param keys: Names of the annotations,
+    :return: The ID of each annotation name
+    """
+    cache = _annotation_key_cache.setdefault(id(conn), {})
+    keys = list(dict.fromkeys(keys))
+    unknown = [key for key in keys if key not in cache]
+    if len(unknown) > 0:
+        sql = f"""SELECT name, id FROM annotation_key
+                  WHERE name IN ({",".join("?" * len(unknown))})"""
+        key_ids = dict(__fetchall(conn, sql, unknown))
+        missing = [(key,) for key in unknown if key not in key_ids]
+        if len(missing) > 0:
+            conn.executemany(_INSERT_ANNOTATION_KEY, missing)
+            key_ids.update(__fetchall(conn, sql, unknown))
+        cache.update(key_ids)
+    return {key: cache[key] for key in keys}
+
+
 def insert_location_annotation(conn: Connection,
                                location_id: str,
                                key: str,
                                value: str):
     """Insert a location annotation to the DB
 
+    The caller is responsible for committing the transaction.
+
     :param conn: Connection to the database
     :param location_id: ID of the location to annotate,
     :param key: Annotation key,
     :param value: Annotation value
     """
     key_id = insert_annotation_key(conn, key)
-    sql = """INSERT INTO location_annotation (location_id, key_id, value)
-             VALUES (?, ?, ?)
-          """
-    conn.cursor().execute(sql, [location_id, key_id, value])
-    conn.commit()
+    conn.execute(_INSERT_LOCATION_ANNOTATION, [location_id, key_id, value])
+
+
+def insert_location_annotations_many(conn: Connection,
+                                     location_id: int,
+                                     annotations: dict[str, any]):
+    """Insert several annotations of a location with a single statement
+
+    The caller is responsible for committing the transaction.
+
+    :param conn: Connection to the database
+    :param location_id: ID of the location to annotate,
+    :param annotations: Annotations as key value pairs
+    """
+    key_ids = insert_annotation_keys(conn, list(annotations.keys()))
+    rows = [(location_id, key_ids[key], value)
+            for key, value in annotations.items()]
+    conn.executemany(_INSERT_LOCATION_ANNOTATION, rows)
 
 
 def insert_data_annotation(conn: Connection,
@@ -121,17 +264,46 @@ def insert_data_annotation(conn: Connection,
                            value: str):
     """Insert a data annotation to the DB
 
+    The caller is responsible for committing the transaction.
+
     :param conn: Connection to the database,
     :param data_uri: URI of the data to annotate,
     :param key: Annotation key,
     :param value: Annotation value
     """
     key_id = insert_annotation_key(conn, key)
-    sql = """INSERT INTO data_annotation (data_id, key_id, value)
-             VALUES ((SELECT id FROM data WHERE uri=?), ?, ?)
-          """
-    conn.cursor().execute(sql, [data_uri, key_id, value])
-    conn.commit()
+    conn.execute(_INSERT_DATA_ANNOTATION, [data_uri, key_id, value])
+
+
+def insert_data_annotations_many(conn: Connection,
+                                 data_uri: str,
+                                 annotations: dict[str, any]):
+    """Insert several annotations of a data with a single statement
+
+    The caller is responsible for committing the transaction.
+
+    :param conn: Connection to the database,
+    :param data_uri: URI of the data to annotate,
+    :param annotations: Annotations as key value pairs
+    """
+    key_ids = insert_annotation_keys(conn, list(annotations.keys()))
+    rows = [(data_uri, key_ids[key], value)
+            for key, value in annotations.items()]
+    conn.executemany(_INSERT_DATA_ANNOTATION, rows)
+
+
+def insert_data_annotations_bulk(conn: Connection,
+                                 items: list[tuple[str, str, any]]):
+    """Insert annotations of several data with a single statement
+
+    The caller is responsible for committing the transaction.
+
+    :param conn: Connection to the database,
+    :param items: (data URI, annotation key, annotation value) tuples
+    """
+    key_ids = insert_annotation_keys(conn, [item[1] for item in items])
+    conn.executemany(_INSERT_DATA_ANNOTATION, [(uri, key_ids[key], value)
+                                               for uri, key, value in items])
 
 
 def storage_type_id(conn: Connection, storage_type: str) -> int:
@@ -141,9 +313,12 @@ def storage_type_id(conn: Connection, storage_type: str) -> int:
     :param storage_type: Storage format,
     :return: The storage type ID
     """
-    sql = "SELECT id FROM storage_type WHERE name=?"
-    id_ = __fetchone(conn, sql, [storage_type])
+    cache = _storage_type_cache.setdefault(id(conn), {})
+    if storage_type in cache:
+        return cache[storage_type]
+    id_ = __fetchone(conn, _SELECT_STORAGE_TYPE, [storage_type])
     if id_ is not None:
+        cache[storage_type] = id_[0]
         return id_[0]
     raise ValueError("storage_type_id: storage type not found")
 
@@ -155,6 +330,8 @@ def insert_data(conn: Connection,
                 metadata_uri: str):
     """Insert a new data entry
 
+    The caller is responsible for committing the transaction.
+
     :param conn: Connection to the database,
     :param location_id: UUID of the location,
     :param uri: Annotation key,
@@ -164,15 +341,28 @@ def insert_data(conn: Connection,
     storage_id = storage_type_id(conn, storage_type)
     if storage_id is None:
         raise ValueError(f'Storage type {storage_type} not recognized')
-    sql = """INSERT INTO data (location_id, type_id, uri, metadata_uri)
-             VALUES (?, ?, ?, ?)
-          """
-    cur = conn.cursor()
-    cur.execute(sql, [location_id, storage_id, uri, metadata_uri])
-    conn.commit()
+    cur = conn.execute(_INSERT_DATA,
+                       [location_id, storage_id, uri, metadata_uri])
     return cur.lastrowid
 
 
+def insert_data_many(conn: Connection,
+                     location_id: int,
+                     items: list[tuple[str, str, str]]):
+    """Insert several data entries at the same location
+
+    The caller is responsible for committing the transaction.
+
+    :param conn: Connection to the database,
+    :param location_id: UUID of the location,
+    :param items: (URI, storage format, metadata URI) of the data
+    """
+    type_ids = {type_: storage_type_id(conn, type_)
+                for type_ in {item[1] for item in items}}
+    conn.executemany(_INSERT_DATA, [(location_id, type_ids[type_], uri, meta)
+                                    for uri, type_, meta in items])
+
+
 def query_data_with_locations(conn: Connection,
                               location_ids: list[int]):
     """Query data at a given locations
@@ -190,9 +380,9 @@ def query_data_with_locations(conn: Connection,
     return __fetchall(conn, sql)
 
 
-def __query_data_with_annotations_both(conn: Connection,
-                                       annotations: dict[str, any]):
-    conditions = query_annotations_conditions(annotations)
+def __data_with_annotations_both_sql(annotations: dict[str, any]
+                                     ) -> tuple[str, list]:
+    conditions, params = query_annotations_conditions(annotations)
 
     sql = f"""WITH location_count AS (
                  SELECT location_id, COUNT(1) as loc_num
@@ -209,24 +399,24 @@ def __query_data_with_annotations_both(conn: Connection,
                  WHERE ({conditions})
                  GROUP BY data_annotation.data_id
              )
-             SELECT location_id, uri, storage_type.name as type, metadata_uri
+             SELECT data.location_id, uri, storage_type.name as type,
+                    metadata_uri
              FROM data 
-             INNER JOIN storage_type ON storage_type.id = data.type_id
-             WHERE data.id IN (
+             INNER JOIN (
                  SELECT data_id 
                  FROM data_count
                  INNER JOIN location_count 
                      ON location_count.location_id = data_count.location_id
-                 WHERE loc_num+data_num={len(annotations)}
-             )
+                 WHERE loc_num+data_num=?
+             ) AS matches ON matches.data_id = data.id
+             INNER JOIN storage_type ON storage_type.id = data.type_id
     """
-    result = __fetchall(conn, sql)
-    return result
+    return sql, params + params + [len(annotations)]
 
 
-def __query_data_with_annotations_data(conn: Connection,
-                                       annotations: dict[str, any]):
-    conditions = query_annotations_conditions(annotations)
+def __data_with_annotations_data_sql(annotations: dict[str, any]
+                                     ) -> tuple[str, list]:
+    conditions, params = query_annotations_conditions(annotations)
     sql = f"""WITH data_count AS (
                  SELECT data_id, 
                         COUNT(1) as data_num
@@ -239,35 +429,31 @@ def __query_data_with_annotations_data(conn: Connection,
                     storage_type.name as type, 
                     metadata_uri
                  FROM data 
+                 INNER JOIN data_count ON data_count.data_id = data.id
                  INNER JOIN storage_type ON storage_type.id = data.type_id
-                 WHERE data.id IN (
-                     SELECT data_id 
-                     FROM data_count
-                     WHERE data_num={len(annotations)}
-             )
+                 WHERE data_num=?
             """
-    return __fetchall(conn, sql)
+    return sql, params + [len(annotations)]
 
 
-def __query_data_with_annotations_loc(conn: Connection,
-                                      annotations: dict[str, any]):
-    conditions = query_annotations_conditions(annotations)
+def __data_with_annotations_loc_sql(annotations: dict[str, any]
+                                    ) -> tuple[str, list]:
+    conditions, params = query_annotations_conditions(annotations)
     sql = f"""WITH location_count AS (
                  SELECT location_id, COUNT(1) as loc_num
                  FROM location_annotation
                  WHERE ({conditions})
                  GROUP BY location_id
              )
-             SELECT location_id, uri, storage_type.name as type, metadata_uri
+             SELECT data.location_id, uri, storage_type.name as type,
+                    metadata_uri
                  FROM data 
+                 INNER JOIN location_count
+                     ON location_count.location_id = data.location_id
                  INNER JOIN storage_type ON storage_type.id = data.type_id
-                 WHERE data.location_id IN (
-                     SELECT location_id 
-                     FROM location_count
-                     WHERE loc_num={len(annotations)}
-             )
+                 WHERE loc_num=?
             """
-    return __fetchall(conn, sql)
+    return sql, params + [len(annotations)]
 
 def query_data_from_uri(conn: Connection, data_uri: str) -> list:
     """Read the data information from it URI
@@ -276,12 +462,7 @@ def query_data_from_uri(conn: Connection, data_uri: str) -> list:
     :param data_uri: URI of the data,
     :return: The information of the data
     """
-    sql = f"""SELECT data.location_id, storage_type.name, data.uri, data.metadata_uri
-              FROM data
-              INNER JOIN storage_type ON storage_type.id = data.type_id
-              WHERE data.uri = '{data_uri}'
-           """
-    return __fetchone(conn, sql)
+    return __fetchone(conn, _SELECT_DATA_FROM_URI, [data_uri])
 
 def query_data_at(conn: Connection, locations: list[int]):
     """Implementation of the data at query
@@ -289,13 +470,56 @@ def query_data_at(conn: Connection, locations: list[int]):
     :param conn: Connection to the database,
     :param locations: Locations to query,
     """
-    locations_str = ",".join([f"'{value}'" for value in locations])
-    sql = f"""SELECT data.location_id, data.uri, storage_type.name, data.metadata_uri
-              FROM data
-              INNER JOIN storage_type ON storage_type.id = data.type_id
-              WHERE data.location_id in ({locations_str})
-           """
-    return __fetchall(conn, sql)
+    # a duplicated location falling in two chunks would list its data twice
+    locations = list(dict.fromkeys(int(location) for location in locations))
+    rows = []
+    # stay below the SQLITE_MAX_VARIABLE_NUMBER of older SQLite versions
+    for start in range(0, len(locations), _MAX_VARIABLES):
+        chunk = locations[start:start + _MAX_VARIABLES]
+        sql = f"""SELECT data.location_id, data.uri, storage_type.name,
+                         data.metadata_uri
+                  FROM data
+                  INNER JOIN storage_type ON storage_type.id = data.type_id
+                  WHERE data.location_id in ({",".join("?" * len(chunk))})
+               """
+        rows += __fetchall(conn, sql, chunk)
+    return rows
+
+def __data_with_annotations_sql(conn: Connection,
+                                annotations: dict[str, any]
+                                ) -> tuple[str, list]:
+    """Build the query of data with given annotations
+
+    The query differs if the annotations are set on locations, on data or
+    on both.
+
+    :param conn: Connection to the database,
+    :param annotations: Annotations of data,
+    :return: The SQL query selecting location_id, uri, type, metadata_uri,
+             and its parameters
+    """
+    keys = list(annotations.keys())
+    anns = ",".join("?" * len(keys))
+    sql = f"""SELECT EXISTS (
+                  SELECT 1 FROM location_annotation AS la
+                  INNER JOIN annotation_key AS ak ON ak.id = la.key_id
+                  WHERE ak.name IN ({anns})
+              ), EXISTS (
+                  SELECT 1 FROM data_annotation AS da
+                  INNER JOIN annotation_key AS ak ON ak.id = da.key_id
+                  WHERE ak.name IN ({anns})
+              )
+          """
+    loc_ann, data_ann = __fetchone(conn, sql, keys + keys)
+
+    if loc_ann and data_ann:
+        return __data_with_annotations_both_sql(annotations)
+    if loc_ann:
+        return __data_with_annotations_loc_sql(annotations)
+    if data_ann:
+        return __data_with_annotations_data_sql(annotations)
+    raise ValueError("query_data_with_annotations: No annotations to query")
+
 
 def query_data_with_annotations(conn: Connection,
                                 annotations: dict[str, any]):
@@ -304,46 +528,59 @@ def query_data_with_annotations(conn: Connection,
     :param conn: Connection to the database,
     :param annotations: Annotations of data,
     """
-    anns = ",".join([f"'{value}'" for value in annotations.keys()])
-    sql = f"""SELECT la.id
-              FROM location_annotation AS la
-              INNER JOIN annotation_key AS ak ON ak.id = la.key_id
-              WHERE ak.name IN ({anns})
-          """
-    loc_ann = __fetchall(conn, sql)
-    sql = f"""SELECT la.id
-              FROM data_annotation AS la
-              INNER JOIN annotation_key AS ak ON ak.id = la.key_id
-              WHERE ak.name IN ({anns})
-          """
-    data_ann = __fetchall(conn, sql)
-
-    if len(loc_ann) > 0 and len(data_ann) > 0:
-        return __query_data_with_annotations_both(conn, annotations)
-    if len(loc_ann) > 0 and len(data_ann) == 0:
-        return __query_data_with_annotations_loc(conn, annotations)
-    if len(loc_ann) == 0 and len(data_ann) > 0:
-        return __query_data_with_annotations_data(conn, annotations)
-    raise ValueError("query_data_with_annotations: No annotations to query")
+    sql, params = __data_with_annotations_sql(conn, annotations)
+    return __fetchall(conn, sql, params)
 
 
-def query_annotations_conditions(annotations: dict[str, any]) -> str:
+def __data_with_annotations_grouped_sql(conn: Connection,
+                                        annotations: list[dict[str, any]]
+                                        ) -> tuple[str, list]:
+    """Build the query of the data of several annotation sets
+
+    :param conn: Connection to the database,
+    :param annotations: List of annotations to query,
+    :return: The SQL query selecting location_id, uri, type, metadata_uri
+             and the group index, and its parameters
+    """
+    queries = []
+    params = []
+    for i, ann in enumerate(annotations):
+        sql, ann_params = __data_with_annotations_sql(conn, ann)
+        queries.append(f"SELECT *, {i} AS grp FROM ({sql})")
+        params += ann_params
+    return " UNION ALL ".join(queries) + " ORDER BY grp", params
+
+
+def query_data_with_annotations_grouped(conn: Connection,
+                                        annotations: list[dict[str, any]]):
+    """Query the data of several annotation sets in a single query
+
+    :param conn: Connection to the database,
+    :param annotations: List of annotations to query,
+    :return: rows of (location_id, uri, type, metadata_uri, group index)
+             ordered by group index
+    """
+    sql, params = __data_with_annotations_grouped_sql(conn, annotations)
+    return __fetchall(conn, sql, params)
+
+
+def query_annotations_conditions(annotations: dict[str, any]
+                                 ) -> tuple[str, list]:
     """SQL query to retrieve annotations
 
+    The keys and values are bound as parameters, so the query text only
+    depends on the number of annotations.
+
     :param annotations: Annotations to query
-    :return: the SQL query text
+    :return: the SQL query text and its parameters
     """
-    sql_conditions = ""
+    condition = """(key_id = (SELECT id FROM annotation_key WHERE name=?)
+                    AND value=?)"""
+    sql_conditions = " OR ".join([condition] * len(annotations))
+    params = []
     for key, value in annotations.items():
-        sql_conditions += f"""(key_id = (
-                                  SELECT id FROM annotation_key 
-                                  WHERE name='{key}'
-                                  ) AND value='{value}'
-                               )
-                           """
-        sql_conditions += " OR "
-    sql_conditions = sql_conditions[:-4]
-    return sql_conditions
+        params += [key, value]
+    return sql_conditions, params
 
 
 def query_location(conn: Connection,
@@ -359,7 +596,7 @@ def query_location(conn: Connection,
         sql = """SELECT id FROM location"""
         return __fetchall(conn, sql)
 
-    conditions = query_annotations_conditions(annotations)
+    conditions, params = query_annotations_conditions(annotations)
 
     sql = f"""WITH location_count AS (
                 SELECT location_id, COUNT(1) as num
@@ -368,9 +605,9 @@ def query_location(conn: Connection,
                 GROUP BY location_id
               )
               SELECT location_id FROM location_count 
-              WHERE num={len(annotations)}
+              WHERE num=?
           """
-    response = __fetchall(conn, sql)
+    response = __fetchall(conn, sql, params + [len(annotations)])
     return response
 
 
@@ -391,17 +628,34 @@ def query_data_annotation(conn: Connection) -> dict[str, list[any]]:
     return out
 
 
+def data_tuples_columns(count: int) -> list[tuple[str, str, str]]:
+    """Names of the data columns returned by query_data_tuples
+
+    :param count: Number of annotations sets of the query,
+    :return: The uri, type and metadata_uri column names of each set
+    """
+    return [("uri", "type", "metadata_uri")] + \
+        [(f"uri_{i}", f"type_{i}", f"metadata_uri_{i}")
+         for i in range(1, count)]
+
+
 def query_data_tuples(conn: Connection, annotations: list[dict[str: any]]):
     """Query tuples of data using annotations
 
+    The columns of the data of each annotation set are named by
+    data_tuples_columns.
+
     :param conn: Connection to the database,
     :param annotations: List of annotations to query
     """
-    out_data = []
-    for ann in annotations:
-        out_data.append(pd.DataFrame(query_data_with_annotations(conn, ann),
-                                     columns=["location_id", "uri", "type",
-                                              "metadata_uri"]))
+    columns = ["location_id", "uri", "type", "metadata_uri"]
+    sql, params = __data_with_annotations_grouped_sql(conn, annotations)
+    df_all = pd.read_sql_query(sql, conn, params=params)
+    df_all.columns = columns + ["grp"]
+    groups = dict(tuple(df_all.groupby("grp", sort=False)))
+    out_data = [groups[i][columns].reset_index(drop=True) if i in groups
+                else pd.DataFrame(columns=columns)
+                for i in range(len(annotations))]
     dfo = out_data[0]
     for i, df_ in enumerate(out_data):
         if i > 0:
@@ -427,32 +681,38 @@ def query_locations_annotation(conn: Connection) -> dict[str, list[any]]:
     return out
 
 
+def __pivot_annotations(conn: Connection,
+                        sql: str,
+                        index: str) -> pd.DataFrame:
+    """Pivot the long format annotations to one column per key
+
+    :param conn: Connection to the database,
+    :param sql: Query selecting the (index, key_id, key name, value) rows,
+    :param index: Name of the index column,
+    :return: The table of the annotations values, ordered by key ID
+    """
+    df_ = pd.read_sql_query(sql, conn)
+    df_.columns = [index, "key_id", "name", "value"]
+    names = dict(zip(df_["key_id"], df_["name"]))
+    # data may have several values for a key: keep the first one
+    df_ = df_.drop_duplicates([index, "key_id"])
+    table = df_.pivot(index=index, columns="key_id", values="value")
+    table.columns = [names[key_id] for key_id in table.columns]
+    return table
+
+
 def query_view_locations(conn: Connection) -> pd.DataFrame:
     """Query to generate a view of all available locations in the dataset
 
      :param conn: Connection to the database,
      :return: a dataframe to visualize the locations
      """
-    sql = """SELECT DISTINCT la.key_id, ak.name
-             FROM location_annotation as la
-             INNER JOIN annotation_key AS ak ON ak.id = la.key_id 
+    sql = """SELECT la.location_id, la.key_id, ak.name, la.value
+             FROM location_annotation AS la
+             INNER JOIN annotation_key AS ak ON ak.id = la.key_id
+             ORDER BY la.location_id
           """
-    keys = __fetchall(conn, sql)
-    col_names = []
-    series = []
-    for key in keys:
-        sql = f"""SELECT location_id, value
-                  FROM location_annotation
-                  WHERE key_id={key[0]}
-               """
-        values = __fetchall(conn, sql)
-        print("values=", values)
-        if values is not None and len(values) > 0:
-            col_names.append(key[1])
-            idx, values = zip(*values)
-            series.append(pd.Series(values, idx))
-    df_ = pd.concat(series, axis=1)
-    df_.columns = col_names
+    df_ = __pivot_annotations(conn, sql, "location_id").rename_axis(None)
     df_['location_id'] = df_.index
     return df_
 
@@ -462,56 +722,55 @@ def __select_data_and_type(conn, loc_filter) -> pd.DataFrame:
                   FROM data
                   INNER JOIN storage_type AS st ON st.id = data.type_id
                   {loc_filter}
+                  ORDER BY data.id
                """
-    results = __fetchall(conn, sql)
-    return pd.DataFrame(results, columns=["data_id", "location", "format"])
+    df_ = pd.read_sql_query(sql, conn)
+    df_.columns = ["data_id", "location", "format"]
+    return df_
 
 
 def __select_loc_annotations(conn, loc_filter) -> pd.DataFrame:
-    sql = """SELECT DISTINCT la.key_id, ak.name
-                FROM location_annotation AS la
-                INNER JOIN annotation_key AS ak ON ak.id = la.key_id
-          """
-    ann_keys = __fetchall(conn, sql)
-    col_names = []
-    series = []
-    for key in ann_keys:
-        sql = f"""SELECT location_id, value
-                  FROM location_annotation
-                  WHERE key_id={key[0]} {loc_filter}
-               """
-        values = __fetchall(conn, sql)
-        if values is not None and len(values) > 0:
-            col_names.append(key[1])
-            idx, values = zip(*values)
-            series.append(pd.Series(values, idx))
-    df_loc_ann = pd.concat(series, axis=1)
-    df_loc_ann.columns = col_names
-    return df_loc_ann.rename_axis('location').reset_index()
+    sql = f"""SELECT la.location_id, la.key_id, ak.name, la.value
+              FROM location_annotation AS la
+              INNER JOIN annotation_key AS ak ON ak.id = la.key_id
+              WHERE 1 {loc_filter}
+              ORDER BY la.location_id
+           """
+    df_loc_ann = __pivot_annotations(conn, sql, "location")
+    return df_loc_ann.reset_index()
 
 
 def __select_data_annotations(conn, loc_filter) -> pd.DataFrame:
-    sql = """SELECT DISTINCT la.key_id, ak.name
-                 FROM data_annotation AS la
-                 INNER JOIN annotation_key AS ak ON ak.id = la.key_id
-          """
-    ann_keys = __fetchall(conn, sql)
-    col_names = []
-    series = []
-    for key in ann_keys:
-        sql = f"""SELECT data_id, value
-                      FROM data_annotation
-                      INNER JOIN data on data.id = data_annotation.data_id
-                      WHERE key_id={key[0]} {loc_filter}
-                   """
-        values = __fetchall(conn, sql)
-        if values is not None and len(values) > 0:
-            col_names.append(key[1])
-            idx, values = zip(*values)
-            series.append(pd.Series(values, idx))
-    df_data_ann = pd.concat(series, axis=1)
-    df_data_ann.columns = col_names
-    return df_data_ann.rename_axis('data_id').reset_index()
+    sql = f"""SELECT da.data_id, da.key_id, ak.name, da.value
+              FROM data_annotation AS da
+              INNER JOIN annotation_key AS ak ON ak.id = da.key_id
+              INNER JOIN data ON data.id = da.data_id
+              WHERE 1 {loc_filter}
+              ORDER BY da.id
+           """
+    df_data_ann = __pivot_annotations(conn, sql, "data_id")
+    return df_data_ann.reset_index()
+
+
+def __locations_set(conn: Connection, locations: list[int]) -> str:
+    """Build the SQL set of locations to filter a query with IN
+
+    Large sets are stored in a temporary table joined by the query, which
+    keeps the SQL short and avoids planning a long list of literals.
+
+    :param conn: Connection to the database,
+    :param locations: IDs of the locations,
+    :return: The SQL set expression
+    """
+    if len(locations) <= 100:
+        return f"({','.join([str(int(elem)) for elem in locations])})"
+    conn.executescript("""CREATE TEMP TABLE IF NOT EXISTS _loc_filter (
+                              id INTEGER PRIMARY KEY
+                          );
+                          DELETE FROM _loc_filter;""")
+    conn.executemany("INSERT OR IGNORE INTO _loc_filter (id) VALUES (?)",
+                     [(elem,) for elem in locations])
+    return "(SELECT id FROM _loc_filter)"
 
 
 def query_view_data(conn: Connection,
@@ -527,9 +786,9 @@ def query_view_data(conn: Connection,
     loc_filter = ""
     loc_filter2 = ""
     if len(locations) > 0:
-        loc_ids = ",".join([str(elem) for elem in locations])
-        loc_filter = f"WHERE location_id IN ({loc_ids})"
-        loc_filter2 = f"AND location_id IN ({loc_ids})"
+        loc_ids = __locations_set(conn, locations)
+        loc_filter = f"WHERE location_id IN {loc_ids}"
+        loc_filter2 = f"AND location_id IN {loc_ids}"
 
     # select data and types
     df_ = __select_data_and_type(conn, loc_filter)
@@ -545,16 +804,106 @@ def query_view_data(conn: Connection,
     return df_out
 
 
+def __annotation_keys(conn: Connection, table: str) -> list[tuple[int, str]]:
+    """Query the annotation keys used in an annotation table
+
+    :param conn: Connection to the database,
+    :param table: location_annotation or data_annotation,
+    :return: The (id, name) of the used keys, in the order of their IDs
+    """
+    sql = f"""SELECT DISTINCT ann.key_id, ak.name
+              FROM {table} AS ann
+              INNER JOIN annotation_key AS ak ON ak.id = ann.key_id
+              ORDER BY ann.key_id
+           """
+    return __fetchall(conn, sql)
+
+
+def __arrow_table(conn: Connection, sql: str, names: list[str]):
+    """Run a query and store its result in an arrow table
+
+    :param conn: Connection to the database,
+    :param sql: The query,
+    :param names: Names of the query columns,
+    :return: The pyarrow.Table of the results
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    rows = __fetchall(conn, sql)
+    columns = list(zip(*rows)) if len(rows) > 0 else [[] for _ in names]
+    return pa.Table.from_arrays([pa.array(col) for col in columns],
+                                names=names)
+
+
+def query_view_locations_arrow(conn: Connection):
+    """Query a view of all the locations annotations as an arrow table
+
+    :param conn: Connection to the database,
+    :return: a pyarrow.Table with one column per annotation key and
+             the location_id column
+    """
+    keys = __annotation_keys(conn, "location_annotation")
+    columns = [f"""(SELECT value FROM location_annotation
+                    WHERE location_id = location.id AND key_id = {key[0]})"""
+               for key in keys]
+    columns.append("location.id")
+    sql = f"""SELECT {", ".join(columns)}
+              FROM location
+              WHERE EXISTS (SELECT 1 FROM location_annotation
+                            WHERE location_id = location.id)
+           """
+    return __arrow_table(conn, sql, [key[1] for key in keys] + ["location_id"])
+
+
+def query_view_data_arrow(conn: Connection, locations: list[int]):
+    """Query a view of the data at given locations as an arrow table
+
+    As for query_view_data, only the data having location and data
+    annotations are listed.
+
+    :param conn: Connection to the database,
+    :param locations: Locations to filter (empty for all locations),
+    :return: a pyarrow.Table with the data_id, location, format columns,
+             and one column per annotation key
+    """
+    loc_keys = __annotation_keys(conn, "location_annotation")
+    data_keys = __annotation_keys(conn, "data_annotation")
+    columns = ["data.id", "data.location_id", "st.name"]
+    columns += [f"""(SELECT value FROM location_annotation
+                     WHERE location_id = data.location_id
+                     AND key_id = {key[0]})"""
+                for key in loc_keys]
+    columns += [f"""(SELECT value FROM data_annotation
+                     WHERE data_id = data.id AND key_id = {key[0]})"""
+                for key in data_keys]
+    loc_filter = ""
+    if len(locations) > 0:
+        loc_ids = __locations_set(conn, locations)
+        loc_filter = f"AND data.location_id IN {loc_ids}"
+    sql = f"""SELECT {", ".join(columns)}
+              FROM data
+              INNER JOIN storage_type AS st ON st.id = data.type_id
+              WHERE EXISTS (SELECT 1 FROM location_annotation
+                            WHERE location_id = data.location_id)
+              AND EXISTS (SELECT 1 FROM data_annotation
+                          WHERE data_id = data.id)
+              {loc_filter}
+              ORDER BY data.id
+           """
+    names = ["data_id", "location", "format"]
+    names += [key[1] for key in loc_keys] + [key[1] for key in data_keys]
+    return __arrow_table(conn, sql, names)
+
+
 def query_delete(conn: Connection, uri: str):
     """Delete a data entry
 
+    The caller is responsible for committing the transaction.
+
     :param conn: Connection to the database,
     :param uri: The URI of the data to delete
     """
-    cur = conn.cursor()
     sql = """DELETE FROM data_annotation
              WHERE data_id = (SELECT id FROM data WHERE uri=?)"""
-    cur.execute(sql, [uri])
+    conn.execute(sql, [uri])
     sql = """DELETE FROM data WHERE uri=?"""
-    cur.execute(sql, [uri])
-    conn.commit()
+    conn.execute(sql, [uri])
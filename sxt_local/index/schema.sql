@@ -35,10 +35,10 @@ CREATE TABLE storage_type (        -- A table to list data types
   name TEXT NOT NULL,              -- name of the type
   format TEXT NOT NULL             -- file format
 );
-INSERT INTO storage_type (name, format) VALUES ('Array', 'Array');
-INSERT INTO storage_type (name, format) VALUES ('Table', 'Table');
-INSERT INTO storage_type (name, format) VALUES ('Value', 'Value');
-INSERT INTO storage_type (name, format) VALUES ('Label', 'Label');
+INSERT INTO storage_type (name, format) VALUES ('Array', 'Array'),
+                                              ('Table', 'Table'),
+                                              ('Value', 'Value'),
+                                              ('Label', 'Label');
 
 CREATE TABLE data (                -- A table to list data
   id INTEGER PRIMARY KEY,          -- Primary key for foreign keys
@@ -1,20 +1,34 @@
 """Implementation of the local storage plugin"""
-import json
+from functools import lru_cache
+import os
 from pathlib import Path
 
 from scixtracer.models import URI
 from scixtracer.models import Dataset
 from scixtracer.metadata import SxMetadata
 
+from .._json import read_json, write_json
+
 
 class SxMetadataLocal(SxMetadata):
     """Interface for storage interactions"""
 
     def __init__(self):
         self.__root = None
+        self.__path = None
 
     def connect(self, workspace: str = None, **kwargs):
         self.__root = Path(workspace).resolve()
+        # resolved paths of the URIs, cleared with the workspace
+        self.__path = lru_cache(maxsize=4096)(self.__resolve_path)
+
+    def __resolve_path(self, uri_value: str) -> Path:
+        """Get the file of a metadata URI
+
+        :param uri_value: Value of the metadata URI,
+        :return: The resolved path of the metadata file
+        """
+        return Path(str(self.__root) + uri_value).resolve()
 
     def init_dataset(self, dataset: Dataset):
         """Initialize the storage for a new dataset
@@ -25,18 +39,42 @@ class SxMetadataLocal(SxMetadata):
         dataset_path.mkdir(exist_ok=True)
         Path(dataset_path / "metadata").mkdir(parents=True)
 
+    @staticmethod
+    def __scan_next_id(root: Path) -> int:
+        """Find the next metadata ID from the files of the directory
+
+        :param root: Directory of the metadata storage
+        :return: The ID following the last metadata file
+        """
+        last_id = 0
+        with os.scandir(root) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".json") and name[:-5].isdigit():
+                    last_id = max(last_id, int(name[:-5]))
+        return last_id + 1
+
     @staticmethod
     def __make_new_uri(root: Path):
         """Build a local URI
 
+        The next ID is stored in the _next_id file of the directory, which
+        is replaced atomically. Directories created without the counter
+        are scanned once.
+
         :param root: Directory of the array storage
         :return: The created URI
         """
-        files = sorted(list(root.glob('*.json')))
-        uuid = 1
-        if len(files) > 0:
-            last_id = int(str(files[-1].name).replace(".json", ""))
-            uuid = last_id + 1
+        counter = root / "_next_id"
+        try:
+            uuid = int(counter.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            uuid = SxMetadataLocal.__scan_next_id(root)
+        while (root / f"{str(uuid).zfill(9)}.json").exists():
+            uuid += 1
+        tmp_counter = root / "_next_id.tmp"
+        tmp_counter.write_text(str(uuid + 1), encoding='utf-8')
+        os.replace(tmp_counter, counter)
         return root / f"{str(uuid).zfill(9)}.json"
 
     def create(self,
@@ -55,8 +93,7 @@ class SxMetadataLocal(SxMetadata):
         metadata_uri = str(filename).replace(str(self.__root), "")
         if content is None:
             content = {}
-        with open(filename, "w", encoding='utf-8') as json_file:
-            json.dump(content, json_file)
+        write_json(filename, content)
         return URI(value=metadata_uri)
 
     def write(self, uri: URI, content: dict[str, any]):
@@ -65,9 +102,7 @@ class SxMetadataLocal(SxMetadata):
         :param uri: Unique identifier of the data,
         :param content: Metadata to write
         """
-        filename = str(Path(str(self.__root) + uri.value).resolve())
-        with open(filename, "w", encoding='utf-8') as json_file:
-            json.dump(content, json_file)
+        write_json(self.__path(uri.value), content)
 
     def read(self, uri: URI) -> dict[str, any]:
         """Read a data metadata
@@ -75,15 +110,13 @@ class SxMetadataLocal(SxMetadata):
         :param uri: Unique identifier of the data,
         :return: the read content
         """
-        filename = str(Path(str(self.__root) + uri.value).resolve())
-        with open(filename, "r", encoding='utf-8') as json_file:
-            return json.load(json_file)
+        return read_json(self.__path(uri.value))
 
     def delete(self, uri: URI):
         """Delete a data
 
         :param uri: Unique identifier of the data,
         """
-        filename = Path(str(Path(str(self.__root) + uri.value).resolve()))
+        filename = self.__path(uri.value)
         if filename.is_file():
             filename.unlink()
@@ -5,19 +5,33 @@ from scixtracer.models import DataInfo
 from scixtracer.models import BatchItem
 from scixtracer.models import Batch
 from scixtracer.runner import SxRunner
+from scixtracer.logger import logger
 
 
 class SxRunnerLocal(SxRunner):
     def __init__(self):
         self.__items = None
+        self.__n_jobs = 1
     """Interface for storage interactions"""
     def connect(self, **kwargs):
-        """Initialize any needed connection to the database"""
+        """Initialize any needed connection to the database
+
+        :param kwargs: n_jobs, the number of worker processes running the
+                       items of a batch (1 by default to run them serially,
+                       -1 for all the CPUs). The inputs of a batch are all
+                       loaded in memory before running it in parallel
+        """
+        self.__n_jobs = kwargs.get("n_jobs", 1)
 
     def run_batch_item(self, item: BatchItem):
-        print("run:", item.func.__name__, ", ", item.inputs)
-        args = self.__load_inputs(item.inputs)
-        outputs = item.func(*args)
+        args = self.__prepare_item(item)
+        self.__write_outputs(item, item.func(*args))
+
+    def __prepare_item(self, item: BatchItem) -> list:
+        logger().debug("run: %s, %s", item.func.__name__, item.inputs)
+        return self.__load_inputs(item.inputs)
+
+    def __write_outputs(self, item: BatchItem, outputs: any):
         if isinstance(outputs, (list, tuple)):
             for i, value in enumerate(outputs):
                 self.storage.write_data(item.outputs[i], value)
@@ -41,6 +55,17 @@ class SxRunnerLocal(SxRunner):
         :param batches: List of batches to run
         """
         for batch in batches:
-            for item in batch.items:
-                self.run_batch_item(item)
+            if self.__n_jobs == 1 or len(batch.items) < 2:
+                for item in batch.items:
+                    self.run_batch_item(item)
+                continue
+            # The storage is not thread safe: the inputs are loaded here,
+            # before joblib consumes the tasks from its dispatch thread, and
+            # the workers only run the functions.
+            inputs = [self.__prepare_item(item) for item in batch.items]
+            outputs = Parallel(n_jobs=self.__n_jobs, return_as="generator")(
+                delayed(item.func)(*args)
+                for item, args in zip(batch.items, inputs))
+            for item, output in zip(batch.items, outputs):
+                self.__write_outputs(item, output)
 
@@ -1,8 +1,12 @@
 """Implementation of the local storage plugin"""
-import json
+from collections import OrderedDict
+from functools import lru_cache
+import os
 from pathlib import Path
 import shutil
 
+from numcodecs import Blosc
+from numcodecs.blosc import list_compressors
 import numpy as np
 import pandas as pd
 import zarr
@@ -13,15 +17,67 @@ from scixtracer.models import Dataset
 from scixtracer.models import StorageTypes
 from scixtracer.storage import SxStorage
 
+from .._csv import read_csv, write_csv
+from .._json import dumps, loads, read_json, write_json
+from .mmap_store import MemoryMappedDirectoryStore
+
 
 class SxStorageLocal(SxStorage):
-    """Interface for storage interactions"""
+    """Interface for storage interactions
+
+    Each dataset stores its tensors as zarr directories in data/array, its
+    tables as CSV files in data/table, and its values and labels as the
+    items of data/value.json and data/label.json. The item files are
+    snapshots completed by an append-only log, so a write appends one line
+    whatever the number of items.
+    """
+
+    max_cached_files = 64
+    max_cached_tensors = 64
+    min_log_records = 1000
+    tensor_codec = "lz4"
+    tensor_clevel = 1
+    fast_tables = True
 
     def __init__(self):
         self.__root = None
+        self.__root_str = None
+        self.__item_path = None
+        self.__items: OrderedDict[str, dict[str, any]] = OrderedDict()
+        self.__next_id: dict[str, int] = {}
+        self.__log_records: dict[str, int] = {}
+        self.__next_uuid: dict[str, int] = {}
+        self.__tensors: OrderedDict[str, zarr.Array] = OrderedDict()
 
     def connect(self, workspace: str = None, **kwargs):
+        """Initialize the storage
+
+        :param workspace: Path to the dataset workspace,
+        :param tensor_codec: Blosc codec of the new tensors, None to store
+                             them uncompressed,
+        :param tensor_clevel: Compression level of the new tensors,
+        :param fast_tables: False to write the tables with pandas to_csv,
+                            pyarrow and polars format some values differently
+        """
+        if "tensor_codec" in kwargs:
+            codec = kwargs["tensor_codec"]
+            if codec is not None and codec not in list_compressors():
+                raise ValueError(f"Unknown tensor codec {codec}")
+            self.tensor_codec = codec
+        if "tensor_clevel" in kwargs:
+            self.tensor_clevel = int(kwargs["tensor_clevel"])
+        if "fast_tables" in kwargs:
+            self.fast_tables = bool(kwargs["fast_tables"])
         self.__root = Path(workspace).resolve()
+        # URIs are relative to the resolved root, they are joined as strings
+        self.__root_str = str(self.__root)
+        # file and ID of the value and label URIs, cleared with the workspace
+        self.__item_path = lru_cache(maxsize=4096)(self.__split_item_uri)
+        self.__items.clear()
+        self.__next_id.clear()
+        self.__log_records.clear()
+        self.__next_uuid.clear()
+        self.__tensors.clear()
 
     def init_dataset(self, dataset: Dataset):
         """Initialize the storage for a new dataset
@@ -30,14 +86,16 @@ class SxStorageLocal(SxStorage):
         """
         dataset_path = self.__root / dataset.uri.value
         dataset_path.mkdir(exist_ok=True)
-        Path(dataset_path / "data" / "array").mkdir(parents=True)
-        Path(dataset_path / "data" / "table").mkdir(parents=True)
-        with open(dataset_path / "data" / "value.json",
-                  "w", encoding='utf-8') as json_file:
-            json.dump({}, json_file)
-        with open(dataset_path / "data" / "label.json",
-                  "w", encoding='utf-8') as json_file:
-            json.dump({}, json_file)
+        # the calls take microseconds, running them in threads is slower
+        os.makedirs(dataset_path / "data" / "array")
+        os.mkdir(dataset_path / "data" / "table")
+        snapshot = dumps({"next_id": 1, "items": {}})
+        for name in ("value.json", "label.json"):
+            filename = str(dataset_path / "data" / name)
+            with open(filename, "wb") as json_file:
+                json_file.write(snapshot)
+            # the files are empty, no need to read them back on first use
+            self.__cache_items(filename, {}, 1, 0)
 
     @staticmethod
     def array_types() -> tuple:
@@ -72,32 +130,61 @@ class SxStorageLocal(SxStorage):
         return (str, )
 
     @staticmethod
-    def __make_tensor_uri(root: Path):
+    def __scan_next_uuid(root: Path, suffix: str) -> int:
+        """Find the next ID from the files of a directory
+
+        :param root: Directory of the storage,
+        :param suffix: Extension of the files,
+        :return: The ID following the last file
+        """
+        last_id = 0
+        with os.scandir(root) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(suffix) and name[:-len(suffix)].isdigit():
+                    last_id = max(last_id, int(name[:-len(suffix)]))
+        return last_id + 1
+
+    def __make_uri(self, root: Path, suffix: str) -> Path:
+        """Build a local URI
+
+        The next ID of each directory is kept in memory, and saved in its
+        .next_id file so that the directory is only scanned once.
+
+        :param root: Directory of the storage,
+        :param suffix: Extension of the files,
+        :return: The created URI
+        """
+        key = str(root)
+        uuid = self.__next_uuid.get(key)
+        if uuid is None:
+            try:
+                uuid = int((root / ".next_id").read_text(encoding='utf-8'))
+            except (FileNotFoundError, ValueError):
+                uuid = self.__scan_next_uuid(root, suffix)
+        while (root / f"{str(uuid).zfill(9)}{suffix}").exists():
+            uuid += 1
+        self.__next_uuid[key] = uuid + 1
+        tmp_counter = root / ".next_id.tmp"
+        tmp_counter.write_text(str(uuid + 1), encoding='utf-8')
+        os.replace(tmp_counter, root / ".next_id")
+        return root / f"{str(uuid).zfill(9)}{suffix}"
+
+    def __make_tensor_uri(self, root: Path):
         """Build a local URI
 
         :param root: Directory of the array storage
         :return: The created URI
         """
-        files = sorted(list(root.glob('*.zarr')))
-        uuid = 1
-        if len(files) > 0:
-            last_id = int(str(files[-1].name).replace(".zarr", ""))
-            uuid = last_id + 1
-        return root / f"{str(uuid).zfill(9)}.zarr"
+        return self.__make_uri(root, ".zarr")
 
-    @staticmethod
-    def __make_table_uri(root: Path):
+    def __make_table_uri(self, root: Path):
         """Build a local URI
 
         :param root: Directory of the array storage
         :return: The created URI
         """
-        files = sorted(list(root.glob('*.csv')))
-        uuid = 1
-        if len(files) > 0:
-            last_id = int(str(files[-1].name).replace(".csv", ""))
-            uuid = last_id + 1
-        return root / f"{str(uuid).zfill(9)}.csv"
+        return self.__make_uri(root, ".csv")
 
     def create_tensor(self,
                       dataset: Dataset,
@@ -114,17 +201,36 @@ class SxStorageLocal(SxStorage):
         filename = self.__make_tensor_uri(self.__root /
                                           dataset.uri.value /
                                           "data" / "array")
-        tensor_uri = str(filename).replace(str(self.__root), "")
+        tensor_uri = str(filename).replace(self.__root_str, "")
         if shape is not None and array is None:
-            chunks = shape
-            dtype = 'f4'
-            zarr.open(str(filename), mode='w', shape=shape,
-                      chunks=chunks, dtype=dtype)
+            self.__create_zarr(str(filename), shape, 'f4')
         if array is not None and shape is None:
-            z_array = zarr.open(str(filename), mode='w')
-            z_array[:] = array
+            z_array = self.__create_zarr(str(filename), array.shape,
+                                         array.dtype)
+            z_array[...] = array
         return URI(value=tensor_uri)
 
+    def __create_zarr(self, filename: str, shape: tuple[int, ...],
+                      dtype: any):
+        """Create a zarr array
+
+        The chunks are guessed by zarr from the shape and type, and
+        compressed with the Blosc codec of the storage, lz4 by default.
+        Uncompressed chunks are memory mapped when read.
+
+        :param filename: Path of the array,
+        :param shape: Shape of the array,
+        :param dtype: Type of the elements,
+        :return: The opened zarr array
+        """
+        compressor = None
+        if self.tensor_codec is not None:
+            compressor = Blosc(cname=self.tensor_codec,
+                               clevel=self.tensor_clevel,
+                               shuffle=Blosc.BITSHUFFLE)
+        return zarr.open(filename, mode='w', shape=shape, dtype=dtype,
+                         chunks=True, compressor=compressor)
+
     def write_tensor(self,
                      uri: URI,
                      array: np.ndarray
@@ -134,9 +240,10 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         :param array: Data content
         """
-        filename = str(Path(str(self.__root) + str(uri.value)).resolve())
-        z_array = zarr.open(filename, mode='w')
-        z_array[:] = array
+        filename = self.__root_str + uri.value
+        self.__tensors.pop(filename, None)
+        z_array = self.__create_zarr(filename, array.shape, array.dtype)
+        z_array[...] = array
 
     def read_tensor(self,
                     uri: URI
@@ -146,9 +253,35 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         :return: the read array
         """
-        filename = str(Path(str(self.__root) + str(uri.value)).resolve())
+        filename = self.__root_str + uri.value
+        # zarr already returns a new ndarray
+        return self.__open_tensor(filename)[...]
+
+    def __open_tensor(self, filename: str) -> zarr.Array:
+        """Get the read handle of a tensor
+
+        The handles are kept for the next reads, and dropped when the
+        tensor is written or deleted. Uncompressed arrays are reopened with
+        memory mapped chunks, the compressed ones are decompressed into a
+        new buffer anyway.
+
+        :param filename: Path of the zarr array,
+        :return: The array opened in read mode
+        """
+        if filename in self.__tensors:
+            self.__tensors.move_to_end(filename)
+            return self.__tensors[filename]
         z_array = zarr.open(filename, mode='r')
-        return np.array(z_array[:])
+        if isinstance(z_array, zarr.Group):
+            # older versions stored the array in a group, as its "[:]" item
+            z_array = z_array[:]
+        if z_array.compressor is None and not z_array.filters:
+            z_array = zarr.open_array(MemoryMappedDirectoryStore(filename),
+                                      mode='r', path=z_array.path)
+        while len(self.__tensors) >= self.max_cached_tensors:
+            self.__tensors.popitem(last=False)
+        self.__tensors[filename] = z_array
+        return z_array
 
     def create_table(self, dataset: Dataset, table: pd.DataFrame):
         """Write table data into storage
@@ -163,8 +296,8 @@ class SxStorageLocal(SxStorage):
             with open(str(filename), 'w', encoding='utf-8'):
                 pass
         else:
-            table.to_csv(filename)
-        table_uri = URI(value=str(filename).replace(str(self.__root), ""))
+            write_csv(filename, table, self.fast_tables)
+        table_uri = URI(value=str(filename).replace(self.__root_str, ""))
         return table_uri
 
     def write_table(self, uri: URI, table: pd.DataFrame):
@@ -173,8 +306,8 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         :param table: Data table to write
         """
-        filename = str(Path(str(self.__root) + str(uri.value)).resolve())
-        table.to_csv(filename)
+        filename = self.__root_str + uri.value
+        write_csv(filename, table, self.fast_tables)
 
     def read_table(self, uri: URI, ) -> pd.DataFrame:
         """Read a table from the dataset storage
@@ -182,8 +315,218 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         :return: the read table
         """
-        filename = str(Path(str(self.__root) + str(uri.value)).resolve())
-        return pd.read_csv(filename)
+        filename = self.__root_str + uri.value
+        return read_csv(filename)
+
+    @staticmethod
+    def __log_file(filename: str) -> str:
+        """Path of the changes log of a value or label file
+
+        :param filename: Path of the JSON file,
+        :return: The path of the NDJSON log
+        """
+        return filename[:-len(".json")] + ".ndjson"
+
+    def __load_items(self, filename: str) -> dict[str, any]:
+        """Get the items of a value or label file
+
+        The JSON file is a snapshot of the items and of the next ID, and
+        the changes made since are appended to a NDJSON log. Both are read
+        once and kept in memory. The plugin is expected to be the only
+        writer of the files. Files written by older versions, with the
+        items at the top level, are converted on first read.
+
+        :param filename: Path of the JSON file,
+        :return: The items of the file, by ID
+        """
+        if filename in self.__items:
+            self.__items.move_to_end(filename)
+            return self.__items[filename]
+        snapshot = read_json(filename)
+        legacy = "items" not in snapshot
+        if legacy:
+            data = snapshot
+            next_id = max(map(int, data.keys()), default=0) + 1
+        else:
+            data = snapshot["items"]
+            next_id = snapshot["next_id"]
+        log, torn = self.__read_log(self.__log_file(filename))
+        for record in log:
+            if record.get("del", False):
+                data.pop(record["id"], None)
+            else:
+                data[record["id"]] = record["v"]
+            next_id = max(next_id, int(record["id"]) + 1)
+        self.__cache_items(filename, data, next_id, len(log))
+        if torn or legacy:
+            # restart the log, so that the next records can be read back
+            self.__compact_items(filename)
+        return data
+
+    @staticmethod
+    def __read_log(filename: str) -> tuple[list[dict[str, any]], bool]:
+        """Read the records of an items log
+
+        The lines are parsed at once as a single JSON array, and one by
+        one when the last append was interrupted.
+
+        :param filename: Path of the NDJSON log,
+        :return: The records, and whether the log ends with a torn line
+        """
+        try:
+            with open(filename, "rb") as log_file:
+                lines = log_file.read().splitlines()
+        except FileNotFoundError:
+            return [], False
+        try:
+            return loads(b"[" + b",".join(lines) + b"]"), False
+        except ValueError:
+            pass
+        records = []
+        for line in lines:
+            try:
+                records.append(loads(line))
+            except ValueError:
+                # interrupted append: the record was not saved
+                return records, True
+        return records, False
+
+    def __cache_items(self, filename: str, data: dict[str, any],
+                      next_id: int, records: int):
+        """Keep the items of a value or label file in memory
+
+        The least recently used files are evicted from the cache.
+
+        :param filename: Path of the JSON file,
+        :param data: Items of the file, by ID,
+        :param next_id: ID of the next created item,
+        :param records: Number of records in the log of the file
+        """
+        while len(self.__items) >= self.max_cached_files:
+            evicted = self.__items.popitem(last=False)[0]
+            self.__next_id.pop(evicted, None)
+            self.__log_records.pop(evicted, None)
+        self.__items[filename] = data
+        self.__next_id[filename] = next_id
+        self.__log_records[filename] = records
+
+    def __log_item(self, filename: str, uuid: str, value: any = None,
+                   delete: bool = False):
+        """Append the change of an item to the log of its file
+
+        The file is compacted when the log gets longer than twice the
+        number of items, and at least min_log_records.
+
+        :param filename: Path of the JSON file,
+        :param uuid: ID of the changed item,
+        :param value: New value of the item,
+        :param delete: True if the item was removed
+        """
+        record = {"id": uuid, "del": True} if delete else \
+            {"id": uuid, "v": value}
+        self.__append_log(filename, [record])
+
+    def __append_log(self, filename: str, records: list[dict[str, any]]):
+        """Append records to the log of a value or label file
+
+        The records are written at once, and the file is compacted if
+        needed.
+
+        :param filename: Path of the JSON file,
+        :param records: Changes of the items
+        """
+        with open(self.__log_file(filename), "ab") as log_file:
+            log_file.write(b"".join(dumps(record) + b"\n"
+                                    for record in records))
+        self.__log_records[filename] += len(records)
+        if self.__log_records[filename] > max(
+                2 * len(self.__items[filename]), self.min_log_records):
+            self.__compact_items(filename)
+
+    def __compact_items(self, filename: str):
+        """Write the cached items to the JSON file and clear the log
+
+        Replaying the log on the new snapshot gives the same items, so an
+        interruption between the two steps loses nothing.
+
+        :param filename: Path of the JSON file
+        """
+        write_json(filename, {"next_id": self.__next_id[filename],
+                              "items": self.__items[filename]})
+        try:
+            os.remove(self.__log_file(filename))
+        except FileNotFoundError:
+            pass
+        self.__log_records[filename] = 0
+
+    def __create_item(self, filename: Path, value: any) -> URI:
+        """Add an item to a value or label file
+
+        :param filename: Path of the JSON file,
+        :param value: Value of the item,
+        :return: The URI of the item
+        """
+        data = self.__load_items(str(filename))
+        new_id = self.__next_id[str(filename)]
+        self.__next_id[str(filename)] = new_id + 1
+        data[str(new_id)] = value
+        self.__log_item(str(filename), str(new_id), value)
+
+        uri_value = f"{str(filename)}.{new_id}".replace(self.__root_str, "")
+        return URI(value=uri_value)
+
+    def __create_items(self, filename: Path, values: list) -> list[URI]:
+        """Add items to a value or label file, with a single write
+
+        :param filename: Path of the JSON file,
+        :param values: Values of the items,
+        :return: The URIs of the items, in the order of the values
+        """
+        values = list(values)
+        if not values:
+            return []
+        data = self.__load_items(str(filename))
+        first_id = self.__next_id[str(filename)]
+        ids = [str(new_id)
+               for new_id in range(first_id, first_id + len(values))]
+        data.update(zip(ids, values))
+        self.__next_id[str(filename)] = first_id + len(ids)
+        self.__append_log(str(filename), [{"id": uuid, "v": value}
+                                          for uuid, value in zip(ids, values)])
+
+        uri_prefix = str(filename).replace(self.__root_str, "")
+        return [URI(value=f"{uri_prefix}.{uuid}") for uuid in ids]
+
+    def __split_item_uri(self, uri_value: str) -> tuple[str, str]:
+        """Get the file and the ID of a value or label URI
+
+        :param uri_value: Value of the item URI,
+        :return: The path of the JSON file and the ID of the item
+        """
+        filename, uuid = uri_value.rsplit('.', 1)
+        return self.__root_str + filename, uuid
+
+    def __write_item(self, uri: URI, value: any):
+        """Set the value of an item of a value or label file
+
+        :param uri: Unique identifier of the file and item,
+        :param value: Value of the item
+        """
+        filename, uuid = self.__item_path(uri.value)
+        data = self.__load_items(filename)
+        data[uuid] = value
+        if int(uuid) >= self.__next_id[filename]:
+            self.__next_id[filename] = int(uuid) + 1
+        self.__log_item(filename, uuid, value)
+
+    def __read_item(self, uri: URI) -> any:
+        """Read an item of a value or label file
+
+        :param uri: Unique identifier of the file and item,
+        :return: The value of the item
+        """
+        filename, uuid = self.__item_path(uri.value)
+        return self.__load_items(filename)[uuid]
 
     def create_value(self, dataset: Dataset, value: float) -> URI:
         """Write a value into storage
@@ -192,21 +535,18 @@ class SxStorageLocal(SxStorage):
         :param value: Value to write
         """
         filename = self.__root / dataset.uri.value / "data" / "value.json"
-        with open(filename, "r", encoding='utf-8') as json_file:
-            data = json.load(json_file)
-
-        if len(data.keys()) > 0:
-            keys = list(map(int, data.keys()))
-            new_id = max(keys) + 1
-        else:
-            new_id = 1
-        data[new_id] = value
+        return self.__create_item(filename, value)
 
-        with open(filename, "w", encoding='utf-8') as json_file:
-            json.dump(data, json_file)
+    def create_values(self, dataset: Dataset, values: list[float]
+                      ) -> list[URI]:
+        """Write values into storage
 
-        uri_value = f"{str(filename)}.{new_id}".replace(str(self.__root), "")
-        return URI(value=uri_value)
+        :param dataset: Destination dataset,
+        :param values: Values to write,
+        :return: The URIs of the values, in the same order
+        """
+        filename = self.__root / dataset.uri.value / "data" / "value.json"
+        return self.__create_items(filename, values)
 
     def write_value(self, uri: URI, value: float):
         """Write a value into storage
@@ -214,15 +554,7 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         :param value: Value to write
         """
-        filename, uuid = uri.value.rsplit('.', 1)
-        filename = str(Path(str(self.__root) + filename).resolve())
-        with open(filename, "r", encoding='utf-8') as json_file:
-            data = json.load(json_file)
-
-        data[str(uuid)] = value
-
-        with open(filename, "w", encoding='utf-8') as json_file:
-            json.dump(data, json_file)
+        self.__write_item(uri, value)
 
     def read_value(self, uri: URI) -> float:
         """Read a value from the dataset storage
@@ -230,11 +562,7 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         :return: the read value
         """
-        filename, uuid = uri.value.rsplit('.', 1)
-        filename = str(Path(str(self.__root) + filename).resolve())
-        with open(filename, "r", encoding='utf-8') as json_file:
-            data = json.load(json_file)
-            return data[str(uuid)]
+        return self.__read_item(uri)
 
     def create_label(self, dataset: Dataset, value: str):
         """Write a value into storage
@@ -243,21 +571,18 @@ class SxStorageLocal(SxStorage):
         :param value: Value to write
         """
         filename = self.__root / dataset.uri.value / "data" / "label.json"
-        with open(filename, "r", encoding='utf-8') as json_file:
-            data = json.load(json_file)
-
-        if len(data.keys()) > 0:
-            keys = list(map(int, data.keys()))
-            new_id = max(keys) + 1
-        else:
-            new_id = 1
-        data[new_id] = value
+        return self.__create_item(filename, value)
 
-        with open(filename, "w", encoding='utf-8') as json_file:
-            json.dump(data, json_file)
+    def create_labels(self, dataset: Dataset, values: list[str]
+                      ) -> list[URI]:
+        """Write labels into storage
 
-        uri_value = f"{str(filename)}.{new_id}".replace(str(self.__root), "")
-        return URI(value=uri_value)
+        :param dataset: Destination dataset,
+        :param values: Labels to write,
+        :return: The URIs of the labels, in the same order
+        """
+        filename = self.__root / dataset.uri.value / "data" / "label.json"
+        return self.__create_items(filename, values)
 
     def write_label(self, uri: URI, value: str):
         """Write a label into storage
@@ -265,15 +590,7 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         :param value: Value to write
         """
-        filename, uuid = uri.value.rsplit('.', 1)
-        filename = str(Path(str(self.__root) + filename).resolve())
-        with open(filename, "r", encoding='utf-8') as json_file:
-            data = json.load(json_file)
-
-        data[str(uuid)] = value
-
-        with open(filename, "w", encoding='utf-8') as json_file:
-            json.dump(data, json_file)
+        self.__write_item(uri, value)
 
     def read_label(self, uri: URI) -> str:
         """Read a label from the dataset storage
@@ -281,11 +598,7 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         :return: the read value
         """
-        filename, uuid = uri.value.rsplit('.', 1)
-        filename = str(Path(str(self.__root) + filename).resolve())
-        with open(filename, "r", encoding='utf-8') as json_file:
-            data = json.load(json_file)
-            return data[str(uuid)]
+        return self.__read_item(uri)
 
     def delete(self, storage_type: StorageTypes, uri: URI):
         """Delete a data
@@ -294,11 +607,18 @@ class SxStorageLocal(SxStorage):
         :param uri: Unique identifier of the data,
         """
         if storage_type in (StorageTypes.ARRAY, StorageTypes.TABLE):
-            filename = str(Path(str(self.__root) + str(uri.value)).resolve())
-            if Path(filename).is_dir():
-                shutil.rmtree(filename)
-            elif Path(filename).is_file():
-                Path(filename).unlink()
+            filename = self.__root_str + uri.value
+            self.__tensors.pop(filename, None)
+            # tables are files and tensors directories, try the file first
+            try:
+                os.unlink(filename)
+            except (IsADirectoryError, PermissionError):
+                if os.path.isdir(filename):
+                    shutil.rmtree(filename)
+                else:
+                    raise
+            except FileNotFoundError:
+                pass
         else:
             self.__remove_item(uri)
 
@@ -307,12 +627,7 @@ class SxStorageLocal(SxStorage):
 
         :param uri: Unique identifier of the file and item
         """
-        filename, uuid = uri.value.rsplit('.', 1)
-        filename = str(Path(str(self.__root) + filename).resolve())
-        with open(filename, "r", encoding='utf-8') as json_file:
-            data = json.load(json_file)
-
-        data.pop(str(uuid), None)
-
-        with open(filename, "w", encoding='utf-8') as json_file:
-            json.dump(data, json_file)
+        filename, uuid = self.__item_path(uri.value)
+        data = self.__load_items(filename)
+        data.pop(uuid, None)
+        self.__log_item(filename, uuid, delete=True)
@@ -0,0 +1,23 @@
+"""Zarr directory store reading the chunks through memory maps"""
+import mmap
+import os
+
+import zarr
+
+
+class MemoryMappedDirectoryStore(zarr.DirectoryStore):
+    """Directory store returning memory mapped views of the chunk files
+
+    The kernel pages the chunks in on demand instead of copying them into
+    a bytes object. It only benefits the uncompressed arrays, the storage
+    does not use it for the compressed ones. Files smaller than a page,
+    such as the metadata, are read normally.
+    """
+
+    @staticmethod
+    def _fromfile(fn):
+        with open(fn, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size < mmap.PAGESIZE:
+                return fh.read()
+            return memoryview(mmap.mmap(fh.fileno(), 0,
+                                        access=mmap.ACCESS_READ))
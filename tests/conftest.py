@@ -0,0 +1,37 @@
+"""Fixtures of the local plugins tests"""
+import pytest
+
+from scixtracer.models import URI, Dataset
+
+from sxt_local.index import SxIndexLocal
+from sxt_local.storage import SxStorageLocal
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Index plugin connected to an empty workspace"""
+    index_ = SxIndexLocal()
+    index_.connect(str(tmp_path))
+    yield index_
+    index_.close()
+
+
+@pytest.fixture
+def dataset(index):
+    """Empty dataset of the index workspace"""
+    return index.new_dataset("My dataset")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Storage plugin with an empty dataset"""
+    storage_ = SxStorageLocal()
+    storage_.connect(str(tmp_path))
+    storage_.init_dataset(Dataset(name="My dataset", uri=URI(value="my_dataset")))
+    return storage_
+
+
+@pytest.fixture
+def storage_dataset():
+    """Dataset initialized by the storage fixture"""
+    return Dataset(name="My dataset", uri=URI(value="my_dataset"))
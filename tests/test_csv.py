@@ -0,0 +1,151 @@
+"""Tests of the CSV tables serialization"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sxt_local import _csv
+from sxt_local._csv import read_csv, write_csv
+from sxt_local.storage import SxStorageLocal
+
+
+@pytest.mark.parametrize("series", [
+    pd.Series([1.5, 2.0]),
+    pd.Series([1, 2], name="x"),
+    pd.Series(["a", "b"], index=pd.Index([3, 4], name="i")),
+])
+def test_series_roundtrip(storage, storage_dataset, tmp_path, series):
+    uri = storage.create_table(storage_dataset, series)
+    series.to_csv(tmp_path / "expected.csv")
+    expected = pd.read_csv(tmp_path / "expected.csv")
+    pd.testing.assert_frame_equal(storage.read_table(uri), expected)
+
+    storage.write_table(uri, series * 2)
+    (series * 2).to_csv(tmp_path / "expected.csv")
+    expected = pd.read_csv(tmp_path / "expected.csv")
+    pd.testing.assert_frame_equal(storage.read_table(uri), expected)
+
+
+def test_read_types(tmp_path):
+    filename = tmp_path / "table.csv"
+    filename.write_text(
+        ",date,time,timestamp,flag,empty,text\n"
+        "0,2020-01-01,10:00:00,2020-01-01 10:00:00,True,,x\n"
+        "1,2020-01-02,11:00:00,2020-01-02 11:00:00,False,,\n")
+    pd.testing.assert_frame_equal(read_csv(filename), pd.read_csv(filename))
+
+
+def test_read_missing_values(tmp_path):
+    filename = tmp_path / "table.csv"
+    filename.write_text(",value,empty,text\n0,1,,x\n1,,,\n")
+    pd.testing.assert_frame_equal(read_csv(filename), pd.read_csv(filename))
+
+
+def test_write_replaces_file(tmp_path):
+    filename = tmp_path / "table.csv"
+    write_csv(filename, pd.DataFrame({"a": [1, 2]}))
+    write_csv(filename, pd.DataFrame({"b": [3]}))
+    assert list(tmp_path.iterdir()) == [filename]
+    pd.testing.assert_frame_equal(
+        read_csv(filename), pd.DataFrame({"Unnamed: 0": [0], "b": [3]}))
+
+
+def _table() -> pd.DataFrame:
+    """Table with the column types that the writers format differently"""
+    return pd.DataFrame({
+        "int": [1, 2, 3],
+        "float": [0.5, 1e-05, float("nan")],
+        "text": ["x", "y,z", None],
+        "": [True, False, True],
+    }, index=pd.Index([10, 20, 30], name="id"))
+
+
+@pytest.mark.parametrize("table", [_table(), _table()["float"]])
+def test_write_reads_like_to_csv(tmp_path, table):
+    filename = tmp_path / "table.csv"
+    write_csv(filename, table)
+    table.to_csv(tmp_path / "expected.csv")
+    expected = pd.read_csv(tmp_path / "expected.csv")
+    pd.testing.assert_frame_equal(pd.read_csv(filename), expected)
+    pd.testing.assert_frame_equal(read_csv(filename), expected)
+    # the header is written by pandas
+    assert filename.read_text().splitlines()[0] \
+        == (tmp_path / "expected.csv").read_text().splitlines()[0]
+
+
+@pytest.mark.parametrize("table", [_table(), _table()["float"]])
+def test_write_to_csv_text(tmp_path, table):
+    filename = tmp_path / "table.csv"
+    write_csv(filename, table, fast=False)
+    table.to_csv(tmp_path / "expected.csv")
+    assert filename.read_bytes() == (tmp_path / "expected.csv").read_bytes()
+
+
+def test_storage_to_csv_text(tmp_path, storage_dataset):
+    storage = SxStorageLocal()
+    storage.connect(str(tmp_path), fast_tables=False)
+    storage.init_dataset(storage_dataset)
+    uri = storage.create_table(storage_dataset, _table())
+    _table().to_csv(tmp_path / "expected.csv")
+    assert (tmp_path / uri.value.lstrip("/")).read_bytes() \
+        == (tmp_path / "expected.csv").read_bytes()
+
+
+@pytest.mark.parametrize("polars", [True, False])
+def test_write_integral_floats(tmp_path, monkeypatch, polars):
+    if not polars:
+        monkeypatch.setattr(_csv, "pl", None)
+    filename = tmp_path / "table.csv"
+    table = pd.DataFrame({"float": [1.0, 2.0]})
+    write_csv(filename, table)
+    pd.testing.assert_frame_equal(
+        read_csv(filename), table.reset_index(names="Unnamed: 0"))
+
+
+PANDAS_COLUMNS = {
+    "list": [[1, 2], [3]],
+    "tuple": [(1, 2), (3,)],
+    "dict": [{"a": 1}, {"a": 2}],
+    "bytes": [b"x", b"y"],
+    "uint64": np.array([2 ** 63 + 5, 1], dtype="uint64"),
+    "float16": np.array([1.5, 2], dtype="float16"),
+}
+
+
+@pytest.mark.parametrize("polars", [True, False])
+@pytest.mark.parametrize("column", list(PANDAS_COLUMNS))
+def test_write_pandas_columns(tmp_path, monkeypatch, polars, column):
+    if not polars:
+        monkeypatch.setattr(_csv, "pl", None)
+    filename = tmp_path / "table.csv"
+    table = pd.DataFrame({column: PANDAS_COLUMNS[column], "int": [1, 2]})
+    write_csv(filename, table)
+    table.to_csv(tmp_path / "expected.csv")
+    assert filename.read_bytes() == (tmp_path / "expected.csv").read_bytes()
+    pd.testing.assert_frame_equal(
+        read_csv(filename), pd.read_csv(tmp_path / "expected.csv"))
+
+
+def test_create_table_pandas_columns(storage, storage_dataset, tmp_path):
+    table = pd.DataFrame(PANDAS_COLUMNS)
+    uri = storage.create_table(storage_dataset, table)
+    table.to_csv(tmp_path / "expected.csv")
+    assert (tmp_path / uri.value.lstrip("/")).read_bytes() \
+        == (tmp_path / "expected.csv").read_bytes()
+
+
+def test_failed_write_keeps_file(tmp_path, monkeypatch):
+    filename = tmp_path / "table.csv"
+    write_csv(filename, pd.DataFrame({"a": [1]}))
+
+    def fail(self, path, *args, **kwargs):
+        with open(path, "w", encoding="utf-8") as csv_file:
+            csv_file.write(",a\n0,")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(pd.DataFrame, "to_csv", fail)
+    with pytest.raises(KeyboardInterrupt):
+        write_csv(filename, pd.DataFrame({"a": [2]}), fast=False)
+    monkeypatch.undo()
+    assert list(tmp_path.iterdir()) == [filename]
+    pd.testing.assert_frame_equal(
+        read_csv(filename), pd.DataFrame({"Unnamed: 0": [0], "a": [1]}))
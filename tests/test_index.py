@@ -0,0 +1,198 @@
+"""Tests of the local index plugin"""
+import sqlite3
+import threading
+
+import pytest
+
+from scixtracer.models import URI
+
+
+def test_bulk_load_after_query(index, dataset):
+    index.create_data(dataset, URI(value="/a"), "Array", {"kind": "raw"})
+    assert len(index.query_data_single(dataset, {"kind": "raw"})) == 1
+
+    with index.bulk_load(dataset):
+        index.create_data(dataset, URI(value="/b"), "Array", {"kind": "raw"})
+        assert len(index.query_data_single(dataset, {"kind": "raw"})) == 2
+
+    assert len(index.query_data_single(dataset, {"kind": "raw"})) == 2
+    index.create_data(dataset, URI(value="/c"), "Array", {"kind": "raw"})
+    assert len(index.query_data_single(dataset, {"kind": "raw"})) == 3
+
+
+def test_bulk_load_restores_journal(index, dataset, tmp_path):
+    index.query_location(dataset)
+    with index.bulk_load(dataset):
+        pass
+    conn = sqlite3.connect(tmp_path / "my_dataset" / "index.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_bulk_load_during_query(index, dataset):
+    index.create_data(dataset, URI(value="/a"), "Array", {"kind": "raw"})
+    started = threading.Event()
+    release = threading.Event()
+
+    def wait(_):
+        started.set()
+        release.wait(5)
+        return True
+
+    def query():
+        # keep a query connection checked out until the test releases it
+        with index._SxIndexLocal__reader(dataset.uri) as conn:
+            conn.create_function("wait", 1, wait)
+            conn.execute("SELECT wait(id) FROM data").fetchall()
+
+    worker = threading.Thread(target=query)
+    worker.start()
+    started.wait(5)
+    try:
+        with pytest.raises(RuntimeError, match="being queried"):
+            with index.bulk_load(dataset):
+                pass
+    finally:
+        release.set()
+        worker.join()
+    with index.bulk_load(dataset):
+        index.create_data(dataset, URI(value="/b"), "Array", {"kind": "raw"})
+    assert len(index.query_data_single(dataset, {"kind": "raw"})) == 2
+
+
+def test_arrow_views_columns(index, dataset):
+    pytest.importorskip("pyarrow")
+    loc_1 = index.new_location(dataset, {"z": 1})
+    loc_2 = index.new_location(dataset, {"a": 2, "z": 3})
+    index.create_data(loc_1, URI(value="/x"), "Array", {"q": 1})
+    index.create_data(loc_2, URI(value="/y"), "Array", {"b": 1, "q": 2})
+
+    assert index.view_data_arrow(dataset).column_names == \
+        list(index.view_data(dataset).columns)
+    assert index.view_locations_arrow(dataset).column_names == \
+        list(index.view_locations(dataset).columns)
+
+
+def test_views_rows_order(index, dataset):
+    locations = [index.new_location(dataset, {"n": i}) for i in range(3)]
+    for location in reversed(locations):
+        index.create_data(location, URI(value=f"/d{location.uuid}"),
+                          "Array", {"kind": "raw"})
+
+    view = index.view_data(dataset)
+    assert view["data_id"].tolist() == sorted(view["data_id"])
+    assert index.view_locations(dataset)["location_id"].tolist() == \
+        [location.uuid for location in locations]
+
+
+def test_query_data_at_duplicated_locations(index, dataset):
+    locations = [index.new_location(dataset) for _ in range(1200)]
+    for location in locations[:2]:
+        index.create_data(location, URI(value=f"/d{location.uuid}"),
+                          "Array")
+
+    # the first location is in the first and the second chunk of IDs
+    query = locations + locations[:1]
+    data = index.query_data_at(dataset, query)
+    assert sorted(info.uri.value for info in data) == \
+        sorted(f"/d{location.uuid}" for location in locations[:2])
+    assert index.query_data_at(dataset, []) == []
+
+
+def test_create_data_batch(index, dataset):
+    rows = [(URI(value="/a"), "Array", {"channel": "red", "z": 1}),
+            (URI(value="/b"), "Table", None),
+            (URI(value="/c"), "Value", {"channel": "green"})]
+    infos = index.create_data_batch(dataset, rows,
+                                    [URI(value="/meta"), None, None])
+    assert [info.uri.value for info in infos] == ["/a", "/b", "/c"]
+    assert [info.storage_type for info in infos] == ["Array", "Table",
+                                                     "Value"]
+    assert len({info.location.uuid for info in infos}) == 1
+    assert infos[0].metadata_uri.value == "/meta"
+    assert infos[1].metadata_uri is None
+
+    more = index.create_data_batch(infos[0].location,
+                                   [(URI(value="/d"), "Label", {"z": 2})])
+    assert more[0].location == infos[0].location
+    assert index.create_data_batch(dataset, []) == []
+
+    red = index.query_data_single(dataset, {"channel": "red"})
+    assert [info.uri.value for info in red] == ["/a"]
+    info = index.get_data_info(dataset, URI(value="/a"))
+    assert info.metadata_uri.value == "/meta"
+    assert info.location.uuid == infos[0].location.uuid
+    assert len(index.query_data_at(dataset, [infos[0].location])) == 4
+
+
+def test_annotate_many(index, dataset):
+    location = index.new_location(dataset, {"population": "wt"})
+    index.annotate_location_many(location, {"well": "A1", "plate": 2})
+    info = index.create_data(location, URI(value="/a"), "Array")
+    index.annotate_data_many(info, {"channel": "red", "z": 1})
+    index.annotate_data_many(info, {})
+
+    assert index.query_location(dataset, {"well": "A1"}) == [location]
+    assert index.query_location(dataset, {"population": "wt",
+                                          "plate": 2}) == [location]
+    assert [data.uri.value for data in
+            index.query_data_single(dataset, {"channel": "red", "z": 1})] \
+        == ["/a"]
+    assert sorted(index.query_location_annotation(dataset)) \
+        == ["plate", "population", "well"]
+    assert sorted(index.query_data_annotation(dataset)) == ["channel", "z"]
+
+
+def test_annotate_many_rollback(index, dataset):
+    location = index.new_location(dataset)
+    with pytest.raises(sqlite3.Error):
+        index.annotate_location_many(location, {"well": "A1",
+                                                "plate": object()})
+    assert index.query_location_annotation(dataset) == {}
+
+
+def test_delete(index, dataset):
+    info = index.create_data(dataset, URI(value="/a"), "Array",
+                             {"kind": "raw"})
+    index.create_data(info.location, URI(value="/b"), "Array",
+                      {"kind": "raw"})
+    index.delete(info)
+    assert index.get_data_info(dataset, URI(value="/a")) is None
+    assert [data.uri.value for data in
+            index.query_data_single(dataset, {"kind": "raw"})] == ["/b"]
+
+
+def test_datasets(index, dataset):
+    index.set_description(dataset, {"description": "Nuclei", "unit": "µm"})
+    assert index.get_description(dataset) == {"description": "Nuclei",
+                                              "unit": "µm"}
+    datasets = index.datasets()
+    assert datasets.to_dict("records") == [
+        {"uri": "my_dataset", "name": "My dataset", "description": "Nuclei"}]
+    assert index.get_dataset(URI(value="my_dataset")) == dataset
+    with pytest.raises(ValueError):
+        index.new_dataset("My dataset")
+
+
+def test_query_data_group_set(index, dataset):
+    index.create_data(dataset, URI(value="/a"), "Array", {"channel": "red"})
+    index.create_data(dataset, URI(value="/b"), "Array", {"channel": "green"})
+    groups = index.query_data_group_set(dataset, [{"channel": "red"},
+                                                  {"channel": "green"},
+                                                  {"channel": "blue"}])
+    assert [[info.uri.value for info in group] for group in groups] \
+        == [["/a"], ["/b"], []]
+    assert index.query_data_group_set(dataset, []) == []
+
+
+def test_connect_other_workspace(index, dataset, tmp_path):
+    index.create_data(dataset, URI(value="/a"), "Array", {"kind": "raw"})
+    index.connect(str(tmp_path / "other"))
+    other = index.new_dataset("My dataset")
+    index.create_data(other, URI(value="/b"), "Array", {"kind": "raw"})
+    assert [info.uri.value for info in
+            index.query_data_single(other, {"kind": "raw"})] == ["/b"]
+
+    index.connect(str(tmp_path))
+    assert [info.uri.value for info in
+            index.query_data_single(dataset, {"kind": "raw"})] == ["/a"]
@@ -0,0 +1,35 @@
+"""Tests of the JSON files serialization"""
+import pytest
+
+from sxt_local import _json
+from sxt_local._json import dumps, loads, read_json, write_json
+
+
+def test_roundtrip(tmp_path):
+    content = {"name": "My dataset", "values": [1, 2.5, None, True],
+               "nested": {"label": "é"}}
+    write_json(tmp_path / "file.json", content)
+    assert read_json(tmp_path / "file.json") == content
+    assert loads(dumps(content)) == content
+
+
+def test_write_replaces_file(tmp_path):
+    filename = tmp_path / "file.json"
+    write_json(filename, {"a": 1})
+    write_json(filename, {"b": 2})
+    assert read_json(filename) == {"b": 2}
+    assert list(tmp_path.iterdir()) == [filename]
+
+
+def test_interrupted_write_keeps_content(tmp_path, monkeypatch):
+    filename = tmp_path / "file.json"
+    write_json(filename, {"a": 1})
+
+    def fail(content):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(_json, "dumps", fail)
+    with pytest.raises(KeyboardInterrupt):
+        write_json(filename, {"b": 2})
+    assert read_json(filename) == {"a": 1}
+    assert list(tmp_path.iterdir()) == [filename]
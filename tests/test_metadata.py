@@ -0,0 +1,30 @@
+"""Tests of the local metadata plugin"""
+from scixtracer.models import URI, Dataset
+
+from sxt_local.metadata import SxMetadataLocal
+
+
+def test_metadata(tmp_path):
+    dataset = Dataset(name="My dataset", uri=URI(value="my_dataset"))
+    metadata = SxMetadataLocal()
+    metadata.connect(str(tmp_path))
+    metadata.init_dataset(dataset)
+
+    uri = metadata.create(dataset, {"unit": "µm"})
+    assert uri.value == "/my_dataset/metadata/000000001.json"
+    assert metadata.read(uri) == {"unit": "µm"}
+    metadata.write(uri, {"unit": "nm"})
+    assert metadata.read(uri) == {"unit": "nm"}
+    assert metadata.read(metadata.create(dataset)) == {}
+
+    metadata.delete(uri)
+    metadata.delete(uri)
+    assert not (tmp_path / "my_dataset" / "metadata" / "000000001.json") \
+        .exists()
+    # the counter does not give the IDs of the deleted files again
+    assert metadata.create(dataset).value.endswith("000000003.json")
+
+    (tmp_path / "my_dataset" / "metadata" / "_next_id").unlink()
+    metadata = SxMetadataLocal()
+    metadata.connect(str(tmp_path))
+    assert metadata.create(dataset).value.endswith("000000004.json")
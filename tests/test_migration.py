@@ -0,0 +1,160 @@
+"""Tests of the datasets written by the first versions of the plugins"""
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+import zarr
+
+from scixtracer.models import URI, Dataset, StorageTypes
+
+import sxt_local.index
+from sxt_local.index import SxIndexLocal
+from sxt_local.metadata import SxMetadataLocal
+from sxt_local.storage import SxStorageLocal
+
+TENSOR = np.arange(12, dtype="int32").reshape(3, 4)
+TABLE = pd.DataFrame({"area": [10.5, 12.0], "label": ["a", "b"]})
+
+
+@pytest.fixture
+def old_dataset(tmp_path):
+    """Dataset in the layout of the baseline version
+
+    Its index has no indexes and a rollback journal, the value and label
+    files are flat JSON objects, and the tensors are zarr groups holding
+    the array.
+    """
+    dataset_dir = tmp_path / "old_dataset"
+    for sub_dir in ("data/array", "data/table", "metadata"):
+        os.makedirs(dataset_dir / sub_dir)
+    with open(dataset_dir / "info.json", "w", encoding="utf-8") as file:
+        json.dump({"name": "Old dataset"}, file)
+
+    data_dir = dataset_dir / "data"
+    with open(data_dir / "value.json", "w", encoding="utf-8") as file:
+        json.dump({"1": 1.5, "2": 3}, file)
+    with open(data_dir / "label.json", "w", encoding="utf-8") as file:
+        json.dump({"1": "nucleus"}, file)
+    z_array = zarr.open(str(data_dir / "array" / "000000001.zarr"), mode="w")
+    z_array[:] = TENSOR
+    zarr.open(str(data_dir / "array" / "000000002.zarr"), mode="w",
+              shape=(2, 2), chunks=(2, 2), dtype="f4")
+    TABLE.to_csv(data_dir / "table" / "000000001.csv")
+    with open(dataset_dir / "metadata" / "000000001.json", "w",
+              encoding="utf-8") as file:
+        json.dump({"unit": "µm"}, file)
+
+    schema = os.path.join(os.path.dirname(sxt_local.index.__file__),
+                          "schema.sql")
+    conn = sqlite3.connect(dataset_dir / "index.db")
+    with open(schema, encoding="utf-8") as file:
+        conn.executescript(file.read())
+    conn.execute("INSERT INTO location DEFAULT VALUES")
+    conn.execute("INSERT INTO annotation_key (name) VALUES ('population')")
+    conn.execute("INSERT INTO annotation_key (name) VALUES ('kind')")
+    conn.execute("INSERT INTO location_annotation (location_id, key_id, "
+                 "value) VALUES (1, 1, 'wt')")
+    data = [("/old_dataset/data/array/000000001.zarr", "Array",
+             "/old_dataset/metadata/000000001.json"),
+            ("/old_dataset/data/array/000000002.zarr", "Array", ""),
+            ("/old_dataset/data/table/000000001.csv", "Table", ""),
+            ("/old_dataset/data/value.json.1", "Value", ""),
+            ("/old_dataset/data/value.json.2", "Value", ""),
+            ("/old_dataset/data/label.json.1", "Label", "")]
+    for uri, storage_type, metadata_uri in data:
+        conn.execute("INSERT INTO data (location_id, type_id, uri, "
+                     "metadata_uri) VALUES (1, (SELECT id FROM storage_type "
+                     "WHERE name=?), ?, ?)", (storage_type, uri, metadata_uri))
+        conn.execute("INSERT INTO data_annotation (data_id, key_id, value) "
+                     "VALUES ((SELECT id FROM data WHERE uri=?), 2, 'raw')",
+                     (uri,))
+    conn.commit()
+    conn.close()
+    return Dataset(name="Old dataset", uri=URI(value="old_dataset"))
+
+
+def test_index(tmp_path, old_dataset):
+    index = SxIndexLocal()
+    index.connect(str(tmp_path))
+    try:
+        assert index.get_dataset(old_dataset.uri) == old_dataset
+        data = index.query_data_single(old_dataset, {"kind": "raw"})
+        assert len(data) == 6
+        assert data[0].metadata_uri.value \
+            == "/old_dataset/metadata/000000001.json"
+        assert data[1].metadata_uri is None
+        assert index.query_location(old_dataset, {"population": "wt"}) \
+            == [data[0].location]
+
+        index.optimize(old_dataset)
+        new = index.create_data_batch(
+            data[0].location,
+            [(URI(value="/old_dataset/data/value.json.3"), "Value",
+              {"kind": "raw"})])
+        assert len(index.query_data_single(old_dataset, {"kind": "raw"})) \
+            == 7
+        assert index.get_data_info(old_dataset, new[0].uri) is not None
+        view = index.view_data(old_dataset)
+        assert len(view) == 7
+    finally:
+        index.close()
+    conn = sqlite3.connect(tmp_path / "old_dataset" / "index.db")
+    indexes = conn.execute("SELECT name FROM sqlite_master "
+                           "WHERE type='index' AND sql IS NOT NULL")
+    assert indexes.fetchall()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_storage(tmp_path, old_dataset):
+    storage = SxStorageLocal()
+    storage.connect(str(tmp_path))
+    prefix = "/old_dataset/data/"
+
+    np.testing.assert_array_equal(
+        storage.read_tensor(URI(value=prefix + "array/000000001.zarr")),
+        TENSOR)
+    assert storage.read_tensor(
+        URI(value=prefix + "array/000000002.zarr")).shape == (2, 2)
+    pd.testing.assert_frame_equal(
+        storage.read_table(URI(value=prefix + "table/000000001.csv")),
+        TABLE.reset_index(names="Unnamed: 0"))
+    assert storage.read_value(URI(value=prefix + "value.json.2")) == 3
+    assert storage.read_label(URI(value=prefix + "label.json.1")) \
+        == "nucleus"
+
+    # the new data follow the existing ones
+    assert storage.create_tensor(old_dataset, TENSOR).value \
+        == prefix + "array/000000003.zarr"
+    assert storage.create_table(old_dataset, TABLE).value \
+        == prefix + "table/000000002.csv"
+    assert storage.create_value(old_dataset, 4.5).value \
+        == prefix + "value.json.3"
+    assert storage.create_labels(old_dataset, ["cell"])[0].value \
+        == prefix + "label.json.2"
+
+    # an old tensor rewritten with the new layout
+    uri = URI(value=prefix + "array/000000001.zarr")
+    storage.write_tensor(uri, TENSOR * 2)
+    np.testing.assert_array_equal(storage.read_tensor(uri), TENSOR * 2)
+
+    storage = SxStorageLocal()
+    storage.connect(str(tmp_path))
+    assert storage.read_value(URI(value=prefix + "value.json.1")) == 1.5
+    assert storage.read_value(URI(value=prefix + "value.json.3")) == 4.5
+    assert storage.read_label(URI(value=prefix + "label.json.2")) == "cell"
+    storage.delete(StorageTypes.VALUE, URI(value=prefix + "value.json.3"))
+    assert storage.create_value(old_dataset, 5).value \
+        == prefix + "value.json.4"
+
+
+def test_metadata(tmp_path, old_dataset):
+    metadata = SxMetadataLocal()
+    metadata.connect(str(tmp_path))
+    assert metadata.read(URI(value="/old_dataset/metadata/000000001.json")) \
+        == {"unit": "µm"}
+    assert metadata.create(old_dataset, {}).value \
+        == "/old_dataset/metadata/000000002.json"
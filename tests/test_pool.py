@@ -0,0 +1,74 @@
+"""Tests of the pool of SQLite connections"""
+import sqlite3
+
+import pytest
+
+from sxt_local.index.pool import ConnectionPool
+
+
+class Factory:
+    """Connection factory recording the opened connections"""
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.opened.append(conn)
+        return conn
+
+
+def _is_closed(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_checkout_reuses_connections():
+    factory = Factory()
+    pool = ConnectionPool(factory)
+    with pool.checkout() as conn:
+        first = conn
+    with pool.checkout() as conn:
+        assert conn is first
+    assert len(factory.opened) == 1
+
+
+def test_checkout_never_blocks():
+    factory = Factory()
+    pool = ConnectionPool(factory, size=1)
+    with pool.checkout() as conn1, pool.checkout() as conn2:
+        assert conn1 is not conn2
+    # the pool keeps the first released connection and closes the other
+    assert [_is_closed(conn) for conn in factory.opened] == [True, False]
+
+
+def test_drain():
+    factory = Factory()
+    pool = ConnectionPool(factory)
+    with pool.checkout():
+        with pytest.raises(RuntimeError, match="still in use"):
+            pool.drain()
+    pool.drain()
+    assert all(_is_closed(conn) for conn in factory.opened)
+
+
+def test_close_with_connections_in_use():
+    factory = Factory()
+    pool = ConnectionPool(factory)
+    with pool.checkout() as conn:
+        pool.close()
+        assert not _is_closed(conn)
+    assert _is_closed(conn)
+
+
+def test_checkout_factory_error():
+    def factory():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    pool = ConnectionPool(factory)
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.checkout():
+            pass
+    pool.drain()
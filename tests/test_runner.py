@@ -0,0 +1,79 @@
+"""Tests of the local runner plugin"""
+import operator
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from scixtracer.models import URI
+from scixtracer.models import Dataset
+from scixtracer.models import Location
+from scixtracer.models import DataInfo
+
+from sxt_local.runner import local as runner_local
+from sxt_local.runner.local import SxRunnerLocal
+
+
+class ThreadsStorage:
+    """Storage keeping the values of its data and the threads using it"""
+
+    def __init__(self, values: dict[str, any]):
+        self.values = values
+        self.threads = set()
+
+    def read_data(self, data_info: DataInfo) -> any:
+        self.threads.add(threading.get_ident())
+        return self.values[data_info.uri.value]
+
+    def write_data(self, data_info: str, value: any):
+        self.threads.add(threading.get_ident())
+        self.values[data_info] = value
+
+
+def _data_info(uri: str) -> DataInfo:
+    dataset = Dataset(name="dataset", uri=URI(value="dataset"))
+    return DataInfo(location=Location(dataset=dataset, uuid=1),
+                    storage_type="Value", uri=URI(value=uri))
+
+
+def _batch(count: int) -> SimpleNamespace:
+    items = [SimpleNamespace(func=operator.add,
+                             inputs=[_data_info(f"in{i}"), 10],
+                             outputs=[f"out{i}"])
+             for i in range(count)]
+    items.append(SimpleNamespace(func=divmod, inputs=[7, 2],
+                                 outputs=["quotient", "remainder"]))
+    return SimpleNamespace(items=items)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_run(n_jobs):
+    storage = ThreadsStorage({f"in{i}": i for i in range(20)})
+    runner = SxRunnerLocal()
+    runner.connect(n_jobs=n_jobs)
+    runner.storage = storage
+
+    runner.run([_batch(20)])
+
+    assert [storage.values[f"out{i}"] for i in range(20)] == \
+        [i + 10 for i in range(20)]
+    assert storage.values["quotient"] == 3
+    assert storage.values["remainder"] == 1
+    # the storage is only used from the thread running the batch
+    assert storage.threads == {threading.get_ident()}
+
+
+def test_run_serial_by_default(monkeypatch):
+    def parallel(*args, **kwargs):
+        raise AssertionError("the batch was dispatched to joblib")
+
+    monkeypatch.setattr(runner_local, "Parallel", parallel)
+    storage = ThreadsStorage({f"in{i}": i for i in range(4)})
+    runner = SxRunnerLocal()
+    runner.connect()
+    runner.storage = storage
+
+    runner.run([_batch(4)])
+
+    assert [storage.values[f"out{i}"] for i in range(4)] == \
+        [i + 10 for i in range(4)]
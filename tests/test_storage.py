@@ -0,0 +1,179 @@
+"""Tests of the local storage plugin"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from scixtracer.models import StorageTypes
+
+from sxt_local.storage import SxStorageLocal
+from sxt_local.storage.mmap_store import MemoryMappedDirectoryStore
+
+
+def _reconnect(storage: SxStorageLocal, tmp_path) -> SxStorageLocal:
+    """Open the workspace with a new plugin, without the memory caches"""
+    new_storage = SxStorageLocal()
+    new_storage.connect(str(tmp_path))
+    new_storage.min_log_records = storage.min_log_records
+    return new_storage
+
+
+def test_values_and_labels(storage, storage_dataset, tmp_path):
+    value_uri = storage.create_value(storage_dataset, 1.5)
+    value_uris = storage.create_values(storage_dataset, [2, True, 3.5])
+    label_uris = storage.create_labels(storage_dataset, ["a", "é"])
+    label_uri = storage.create_label(storage_dataset, "c")
+    assert value_uri.value == "/my_dataset/data/value.json.1"
+    assert [uri.value[-1] for uri in value_uris] == ["2", "3", "4"]
+    assert [uri.value[-1] for uri in label_uris + [label_uri]] \
+        == ["1", "2", "3"]
+    assert storage.create_values(storage_dataset, []) == []
+
+    storage.write_value(value_uris[0], 4)
+    storage.write_label(label_uri, "d")
+    for store in (storage, _reconnect(storage, tmp_path)):
+        assert [store.read_value(uri) for uri in [value_uri] + value_uris] \
+            == [1.5, 4, True, 3.5]
+        assert [store.read_label(uri) for uri in label_uris + [label_uri]] \
+            == ["a", "é", "d"]
+
+
+def test_delete_items(storage, storage_dataset, tmp_path):
+    uris = storage.create_values(storage_dataset, [1, 2, 3])
+    storage.delete(StorageTypes.VALUE, uris[2])
+    # the IDs of the deleted items are not given again
+    assert storage.create_value(storage_dataset, 4).value.endswith(".4")
+    storage = _reconnect(storage, tmp_path)
+    with pytest.raises(KeyError):
+        storage.read_value(uris[2])
+    assert storage.create_value(storage_dataset, 5).value.endswith(".5")
+
+
+def test_log_replay(storage, storage_dataset, tmp_path):
+    storage.min_log_records = 4
+    data_dir = tmp_path / "my_dataset" / "data"
+    uris = [storage.create_value(storage_dataset, i) for i in range(3)]
+    assert (data_dir / "value.ndjson").read_bytes().count(b"\n") == 3
+    # a log longer than min_log_records and twice the items is compacted
+    for i in range(3):
+        storage.write_value(uris[0], 10 + i)
+    assert (data_dir / "value.ndjson").exists()
+    storage.write_value(uris[0], 13)
+    assert not (data_dir / "value.ndjson").exists()
+    storage.write_value(uris[1], 20)
+
+    storage = _reconnect(storage, tmp_path)
+    assert [storage.read_value(uri) for uri in uris] == [13, 20, 2]
+    assert storage.create_value(storage_dataset, 3).value.endswith(".4")
+
+
+def test_log_torn_line(storage, storage_dataset, tmp_path):
+    uris = storage.create_labels(storage_dataset, ["a", "b"])
+    log_file = tmp_path / "my_dataset" / "data" / "label.ndjson"
+    with open(log_file, "ab") as file:
+        file.write(b'{"id": "3", "v": "c')
+
+    storage = _reconnect(storage, tmp_path)
+    assert [storage.read_label(uri) for uri in uris] == ["a", "b"]
+    # the log is restarted, the next records can be read back
+    uri = storage.create_label(storage_dataset, "d")
+    assert uri.value.endswith(".3")
+    storage = _reconnect(storage, tmp_path)
+    assert storage.read_label(uri) == "d"
+
+
+def test_items_cache_eviction(storage, storage_dataset, tmp_path):
+    storage.max_cached_files = 1
+    value_uri = storage.create_value(storage_dataset, 1)
+    label_uri = storage.create_label(storage_dataset, "a")
+    assert storage.read_value(value_uri) == 1
+    assert storage.create_value(storage_dataset, 2).value.endswith(".2")
+    assert storage.read_label(label_uri) == "a"
+
+
+@pytest.mark.parametrize("array", [
+    np.arange(12, dtype="uint16").reshape(3, 4),
+    np.array(2.5),
+    np.zeros((0, 3)),
+    np.array(["a", "bc"]),
+])
+def test_tensors(storage, storage_dataset, array):
+    uri = storage.create_tensor(storage_dataset, array)
+    read = storage.read_tensor(uri)
+    np.testing.assert_array_equal(read, array)
+    assert read.dtype == array.dtype
+
+    storage.write_tensor(uri, array[::-1] if array.ndim else array + 1)
+    np.testing.assert_array_equal(
+        storage.read_tensor(uri), array[::-1] if array.ndim else array + 1)
+
+
+def test_tensor_shape(storage, storage_dataset):
+    uri = storage.create_tensor(storage_dataset, shape=(2, 3))
+    read = storage.read_tensor(uri)
+    assert read.shape == (2, 3)
+    assert read.dtype == np.float32
+
+
+@pytest.mark.parametrize("codec", [None, "zstd"])
+def test_tensor_codec(tmp_path, storage_dataset, codec):
+    storage = SxStorageLocal()
+    storage.connect(str(tmp_path), tensor_codec=codec, tensor_clevel=3)
+    storage.init_dataset(storage_dataset)
+    array = np.arange(1000, dtype="float64")
+    uri = storage.create_tensor(storage_dataset, array)
+    np.testing.assert_array_equal(storage.read_tensor(uri), array)
+
+    with pytest.raises(ValueError, match="Unknown tensor codec"):
+        storage.connect(str(tmp_path), tensor_codec="unknown")
+
+
+def test_read_tensor_copy(storage, storage_dataset):
+    uri = storage.create_tensor(storage_dataset, np.zeros(4))
+    storage.read_tensor(uri)[0] = 1
+    np.testing.assert_array_equal(storage.read_tensor(uri), np.zeros(4))
+
+
+def test_uri_counters(storage, storage_dataset, tmp_path):
+    array_dir = tmp_path / "my_dataset" / "data" / "array"
+    first = storage.create_tensor(storage_dataset, np.zeros(2))
+    assert first.value == "/my_dataset/data/array/000000001.zarr"
+    assert (array_dir / ".next_id").read_text() == "2"
+    # a file created by another writer is skipped
+    (array_dir / "000000002.zarr").mkdir()
+    assert storage.create_tensor(storage_dataset, np.zeros(2)).value \
+        .endswith("000000003.zarr")
+
+    # a directory without counter is scanned
+    (array_dir / ".next_id").unlink()
+    storage = _reconnect(storage, tmp_path)
+    assert storage.create_tensor(storage_dataset, np.zeros(2)).value \
+        .endswith("000000004.zarr")
+    assert storage.create_table(storage_dataset, None).value \
+        == "/my_dataset/data/table/000000001.csv"
+
+
+def test_delete_files(storage, storage_dataset, tmp_path):
+    tensor_uri = storage.create_tensor(storage_dataset, np.zeros(2))
+    table_uri = storage.create_table(storage_dataset,
+                                     pd.DataFrame({"a": [1]}))
+    storage.read_tensor(tensor_uri)
+    storage.delete(StorageTypes.ARRAY, tensor_uri)
+    storage.delete(StorageTypes.TABLE, table_uri)
+    storage.delete(StorageTypes.TABLE, table_uri)
+    assert not (tmp_path / tensor_uri.value.lstrip("/")).exists()
+    assert not (tmp_path / table_uri.value.lstrip("/")).exists()
+    with pytest.raises(FileNotFoundError):
+        storage.read_table(table_uri)
+
+
+@pytest.mark.parametrize("codec", [None, "lz4"])
+def test_tensor_memory_map(tmp_path, storage_dataset, codec):
+    storage = SxStorageLocal()
+    storage.connect(str(tmp_path), tensor_codec=codec)
+    storage.init_dataset(storage_dataset)
+    array = np.arange(1 << 16, dtype="float64")
+    uri = storage.create_tensor(storage_dataset, array)
+    np.testing.assert_array_equal(storage.read_tensor(uri), array)
+    z_array = storage._SxStorageLocal__tensors[str(tmp_path) + uri.value]
+    assert isinstance(z_array.store, MemoryMappedDirectoryStore) \
+        == (codec is None)